@@ -1,44 +1,200 @@
+import io
 import os
-import json
+import re
+import gzip
+import asyncio
+import hashlib
 import logging
 import time
+import urllib.parse
+from collections import defaultdict
 from datetime import datetime
-from io import BytesIO
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, send_file
+from tempfile import SpooledTemporaryFile
+import orjson
+from quart import Quart, Response, render_template, make_response, request, redirect, url_for, flash, jsonify, after_this_request
+from quart.json.provider import DefaultJSONProvider
+import docx
 from docx import Document
-from utils import get_language_name, timestamp_to_date
+from cachetools import TTLCache
+from utils import LANGUAGES, get_language_name, timestamp_to_date
 import wiki_utils
-import threading
-import requests
 
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Create the Flask application
-app = Flask(__name__)
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson for faster jsonify responses"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+# Create the Quart application (async, Flask-compatible API)
+app = Quart(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.environ.get("SESSION_SECRET", "wikitruth_secret_key")
 
-# Data storage (file-based)
-HIGHLIGHTS_FILE = "highlights.json"
-
-# Common language list
-LANGUAGES = {
-    'en': 'English',
-    'es': 'Spanish',
-    'fr': 'French',
-    'de': 'German',
-    'it': 'Italian',
-    'pt': 'Portuguese',
-    'zh': 'Chinese',
-    'ja': 'Japanese',
-    'ru': 'Russian',
-    'ar': 'Arabic',
-    'hi': 'Hindi',
-    'ko': 'Korean',
-    'tr': 'Turkish',
-}
+# Data storage (file-based): an append-only log with one highlight record per line
+HIGHLIGHTS_FILE = "highlights.ndjson"
+LEGACY_HIGHLIGHTS_FILE = "highlights.json"
+
+# Ensure highlights file exists, migrating the old single-document format once
+def ensure_highlights_file():
+    if os.path.exists(HIGHLIGHTS_FILE):
+        return
+    
+    records = []
+    if os.path.exists(LEGACY_HIGHLIGHTS_FILE):
+        try:
+            with open(LEGACY_HIGHLIGHTS_FILE, 'rb') as f:
+                data = f.read()
+            legacy = orjson.loads(data) if data.strip() else {}
+            for title, article in legacy.items():
+                for lang, entry in article.get('languages', {}).items():
+                    for highlight in entry.get('highlights', []):
+                        records.append({'title': title, 'lang': lang, **highlight})
+        except Exception as e:
+            logger.error(f"Error migrating legacy highlights: {str(e)}")
+    
+    # Several workers may import the app at once. Each writes its own temp file
+    # and links it into place only if no log exists yet, so a slower worker
+    # can't replace a log a faster one has already started appending to
+    tmp_path = f"{HIGHLIGHTS_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.writelines(orjson.dumps(record) + b'\n' for record in records)
+    try:
+        os.link(tmp_path, HIGHLIGHTS_FILE)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp_path)
+
+# Create it once at import so the request path never has to check
+ensure_highlights_file()
+
+# Exported documents up to this size stay in memory; larger ones spill to disk
+EXPORT_SPOOL_MAX_SIZE = 1 << 20
+EXPORT_CHUNK_SIZE = 64 * 1024
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+UNSAFE_FILENAME_RE = re.compile(r'[\\/:*?"<>|]+')
+
+# python-docx's default template, read once instead of from disk for every export
+with open(os.path.join(os.path.dirname(docx.__file__), 'templates', 'default.docx'), 'rb') as template_file:
+    DOCX_TEMPLATE = template_file.read()
+
+def iter_spooled_file(file_stream, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield a spooled file in chunks and close it (removing any temp file) when done"""
+    try:
+        while True:
+            chunk = file_stream.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file_stream.close()
+
+# Process-wide caches for Wikipedia data
+CACHE_TTL = 3600  # Seconds
+article_cache = TTLCache(maxsize=512, ttl=CACHE_TTL)       # (title, lang) -> (article, sections)
+languages_cache = TTLCache(maxsize=512, ttl=CACHE_TTL)     # (title, lang) -> available languages
+translation_cache = TTLCache(maxsize=2048, ttl=CACHE_TTL)  # (text hash, from, to) -> translation
+
+async def get_cached_article(title, lang):
+    """Get an article and its split sections, fetching only on a cache miss"""
+    key = (title, lang)
+    cached = article_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    article = await wiki_utils.get_article_content(title, lang)
+    if not article:
+        return None, None
+    
+    # Split once per article rather than on every view/export
+    sections = wiki_utils.split_content_into_sections(article['content'])
+    article_cache[key] = (article, sections)
+    return article, sections
+
+async def get_cached_available_languages(title, lang):
+    """Get the language links for an article, fetching only on a cache miss"""
+    key = (title, lang)
+    cached = languages_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    available_languages = await wiki_utils.get_available_languages(title, lang)
+    languages_cache[key] = available_languages
+    return available_languages
+
+async def get_cached_translation(text, to_lang, from_lang='auto'):
+    """Translate text, reusing earlier results for the same input"""
+    if not text:
+        return ""
+    
+    # Hash the text so long sections don't become huge cache keys
+    text_hash = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    key = (text_hash, from_lang, to_lang)
+    cached = translation_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    translated = await wiki_utils.translate_text(text, to_lang, from_lang)
+    # The translator returns the input unchanged on failure; don't cache that
+    if translated != text:
+        translation_cache[key] = translated
+    return translated
+
+# Marker used to pack several texts into one translation request. Translation
+# may rewrite the surrounding whitespace, so it is matched loosely on the way back.
+BATCH_SEPARATOR = " §§§ "
+BATCH_SEPARATOR_RE = re.compile(r'\s*§\s*§\s*§\s*')
+
+async def translate_texts_batched(texts, to_lang, from_lang='auto'):
+    """
+    Translate several texts with one batched translation call
+    
+    The texts are joined with BATCH_SEPARATOR so short sections share
+    translation requests. If the separators don't survive translation,
+    the texts are translated one by one instead.
+    
+    Args:
+        texts (list): Texts to translate
+        to_lang (str): Target language code
+        from_lang (str): Source language code
+        
+    Returns:
+        list: Translated texts, in the same order as the input
+    """
+    if not texts:
+        return []
+    
+    translated = await get_cached_translation(BATCH_SEPARATOR.join(texts), to_lang, from_lang)
+    parts = BATCH_SEPARATOR_RE.split(translated.strip())
+    if len(parts) == len(texts):
+        return parts
+    
+    logger.warning("Batch separator lost in translation, translating texts individually")
+    return await asyncio.gather(
+        *(get_cached_translation(text, to_lang, from_lang) for text in texts)
+    )
+
+async def render_with_etag(etag, template, **context):
+    """Render a template tagged with an ETag, or return 304 if the client already has it"""
+    # The client may hold the gzip representation, whose ETag carries a suffix
+    for client_etag in (etag, f"{etag}{GZIP_ETAG_SUFFIX}"):
+        if client_etag in request.if_none_match:
+            response = Response(b'', status=304)
+            response.set_etag(client_etag)
+            response.vary.add('Accept-Encoding')
+            return response
+    
+    response = await make_response(await render_template(template, **context))
+    response.set_etag(etag)
+    return response
 
 # Template filters
 @app.template_filter('timestamp_to_date')
@@ -46,101 +202,213 @@ def _timestamp_to_date(timestamp):
     """Convert timestamp to formatted date"""
     return timestamp_to_date(timestamp)
 
-# Ensure highlights file exists
-def ensure_highlights_file():
-    if not os.path.exists(HIGHLIGHTS_FILE):
-        with open(HIGHLIGHTS_FILE, 'w') as f:
-            json.dump({}, f)
+# In-memory index of the highlights log. Each worker process keeps its own copy
+# and catches up on lines appended by other workers when highlights are read.
+_highlights = defaultdict(list)  # (title, lang) -> highlights
+_highlights_offset = 0  # Bytes of the log already indexed
+_highlights_etag = None
 
-# Load highlights from file
+def _index_highlight(highlights_data, record):
+    """Add one log record to the flat (title, lang) -> highlights index"""
+    highlights_data[(record['title'], record['lang'])].append({
+        'text': record['text'],
+        'context': record['context'],
+        'timestamp': record['timestamp']
+    })
+
+# Load highlights (index whatever was appended to the log since the last call)
 def load_highlights():
-    ensure_highlights_file()
+    global _highlights_offset, _highlights_etag
     try:
-        with open(HIGHLIGHTS_FILE, 'r') as f:
-            return json.load(f)
+        if os.path.getsize(HIGHLIGHTS_FILE) <= _highlights_offset:
+            return _highlights
+        
+        with open(HIGHLIGHTS_FILE, 'rb') as f:
+            f.seek(_highlights_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Still being written; pick it up next time
+                _highlights_offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    _index_highlight(_highlights, orjson.loads(line))
+                except Exception as e:
+                    # e.g. a line cut short by a crash mid-write
+                    logger.warning(f"Skipping bad highlight record: {str(e)}")
+        _highlights_etag = None
     except Exception as e:
         logger.error(f"Error loading highlights: {str(e)}")
-        return {}
+    return _highlights
 
-# Save highlights to file
-def save_highlights(highlights_data):
-    ensure_highlights_file()
+def _append_highlight_line(line):
+    """Append one serialized record; a single O_APPEND write keeps lines whole"""
+    fd = os.open(HIGHLIGHTS_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
     try:
-        with open(HIGHLIGHTS_FILE, 'w') as f:
-            json.dump(highlights_data, f)
-        return True
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+# Save a highlight (append it to the log, then index it along with anything
+# other workers appended in the meantime)
+async def append_highlight(record):
+    try:
+        await asyncio.to_thread(_append_highlight_line, orjson.dumps(record) + b'\n')
     except Exception as e:
-        logger.error(f"Error saving highlights: {str(e)}")
+        logger.error(f"Error saving highlight: {str(e)}")
         return False
+    
+    load_highlights()
+    return True
+
+def get_article_highlights(title, lang):
+    """Get the highlights for one article without adding an empty entry"""
+    return load_highlights().get((title, lang), [])
+
+def group_highlights_by_article(highlights_data):
+    """Build the nested title -> languages view used by the highlights page"""
+    articles = {}
+    for (title, lang), highlights in highlights_data.items():
+        languages = articles.setdefault(title, {'languages': {}})['languages']
+        languages[lang] = {
+            'language_name': get_language_name(lang),
+            'highlights': highlights
+        }
+    return articles
+
+# ETag for the current highlights, recomputed only after they change
+def get_highlights_etag():
+    global _highlights_etag
+    highlights_data = load_highlights()
+    if _highlights_etag is None:
+        _highlights_etag = hashlib.blake2b(
+            orjson.dumps(list(highlights_data.items())), digest_size=16
+        ).hexdigest()
+    return _highlights_etag
+
+@app.before_serving
+async def warm_highlights():
+    load_highlights()
+
+# Close the shared HTTP session on shutdown
+@app.after_serving
+async def close_http_session():
+    await wiki_utils.close_http_session()
+
+# Response compression (the .docx export is already a zip, so only text is compressed)
+COMPRESS_MIMETYPES = frozenset({'text/html', 'application/json'})
+COMPRESS_MIN_SIZE = 500  # Bytes; smaller bodies aren't worth the CPU
+COMPRESS_LEVEL = 6
+GZIP_ETAG_SUFFIX = '-gzip'  # Gzipped bodies differ byte-for-byte, so they get their own ETag
+
+@app.after_request
+async def compress_response(response):
+    """Gzip HTML and JSON responses for clients that accept it"""
+    if (response.mimetype not in COMPRESS_MIMETYPES
+            or response.status_code != 200
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    if 'gzip' not in request.headers.get('Accept-Encoding', ''):
+        return response
+    
+    data = await response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=COMPRESS_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}{GZIP_ETAG_SUFFIX}", weak)
+    return response
+
+# Plain (unsigned) cookie remembering the last search language
+LANG_COOKIE = 'search_lang'
+LANG_COOKIE_MAX_AGE = 60 * 60 * 24 * 365
+
+# Template globals never change, so build the context once
+_GLOBAL_CTX = {
+    'language_dict': LANGUAGES,
+    'get_language_name': get_language_name
+}
 
 # Template context processors
 @app.context_processor
 def inject_globals():
     """Inject global variables into templates"""
-    return {
-        'language_dict': LANGUAGES,
-        'get_language_name': get_language_name
-    }
+    return _GLOBAL_CTX
 
 # Routes
 @app.route('/')
-def home():
+async def home():
     """Home page with search form"""
-    selected_lang = session.get('search_lang', 'en')
-    return render_template('home.html', selected_lang=selected_lang)
+    selected_lang = request.cookies.get(LANG_COOKIE, 'en')
+    return await render_template('home.html', selected_lang=selected_lang)
+
+@app.route('/ping')
+async def ping():
+    """Zero-work endpoint for keep-alive pings"""
+    return 'ok', 200
 
 @app.route('/search', methods=['GET', 'POST'])
-def search():
+async def search():
     """Search Wikipedia for articles"""
     if request.method == 'POST':
-        search_query = request.form.get('search_query', '')
-        search_lang = request.form.get('search_lang', 'en')
+        form = await request.form
+        search_query = form.get('search_query', '')
+        search_lang = form.get('search_lang', 'en')
         
-        # Store in session for easy access
-        session['search_query'] = search_query
-        session['search_lang'] = search_lang
+        # Remember the language in a plain cookie for the home page
+        @after_this_request
+        async def remember_search_lang(response):
+            response.set_cookie(LANG_COOKIE, search_lang, max_age=LANG_COOKIE_MAX_AGE, samesite='Lax')
+            return response
         
         if not search_query:
-            flash('Please enter a search term', 'danger')
+            await flash('Please enter a search term', 'danger')
             return redirect(url_for('home'))
         
         # Search Wikipedia
         try:
-            search_results = wiki_utils.get_wikipedia_search_results(search_query, search_lang)
-            return render_template('search_results.html', 
+            search_results = await wiki_utils.get_wikipedia_search_results(search_query, search_lang)
+            return await render_template('search_results.html', 
                                   search_query=search_query,
                                   search_lang=search_lang, 
                                   search_results=search_results)
         except Exception as e:
             logger.error(f"Search error: {str(e)}")
-            flash(f"Error searching Wikipedia: {str(e)}", 'danger')
+            await flash(f"Error searching Wikipedia: {str(e)}", 'danger')
             return redirect(url_for('home'))
     else:
         # GET request - redirect to home
         return redirect(url_for('home'))
 
 @app.route('/article/<title>')
-def view_article(title):
+async def view_article(title):
     """View a Wikipedia article"""
     lang = request.args.get('lang', 'en')
     show_translation = request.args.get('translate', 'false') == 'true'
     translate_to = request.args.get('to_lang', 'en')
     
     try:
-        # Get article content from Wikipedia
-        article = wiki_utils.get_article_content(title, lang)
+        # Fetch article content and language links concurrently
+        (article, sections), available_languages = await asyncio.gather(
+            get_cached_article(title, lang),
+            get_cached_available_languages(title, lang)
+        )
         
         if not article:
-            flash('Article not found', 'danger')
+            await flash('Article not found', 'danger')
             return redirect(url_for('home'))
         
-        # Process article content into sections
-        sections = wiki_utils.split_content_into_sections(article['content'])
+        # The page only changes when the revision or the view options do
+        etag_source = f"{title}|{lang}|{article.get('revision_id')}|{show_translation}|{translate_to}"
+        etag = hashlib.blake2b(etag_source.encode('utf-8'), digest_size=16).hexdigest()
         
-        # Get available languages for this article
-        available_languages = wiki_utils.get_available_languages(title, lang)
-        
-        return render_template('article.html', 
+        return await render_with_etag(etag, 'article.html', 
                               article=article,
                               sections=sections,
                               lang=lang,
@@ -149,94 +417,69 @@ def view_article(title):
                               available_languages=available_languages)
     except Exception as e:
         logger.error(f"Article view error: {str(e)}")
-        flash(f"Error retrieving article: {str(e)}", 'danger')
+        await flash(f"Error retrieving article: {str(e)}", 'danger')
         return redirect(url_for('home'))
 
 @app.route('/translate-section', methods=['POST'])
-def translate_section():
+async def translate_section():
     """Translate a section of text"""
-    text = request.form.get('text', '')
-    from_lang = request.form.get('from_lang', 'auto')
-    to_lang = request.form.get('to_lang', 'en')
+    form = await request.form
+    text = form.get('text', '')
+    from_lang = form.get('from_lang', 'auto')
+    to_lang = form.get('to_lang', 'en')
     
     if not text or not to_lang:
         return jsonify({'error': 'Missing required parameters'})
     
     try:
-        translated_text = wiki_utils.translate_text(text, to_lang, from_lang)
+        translated_text = await get_cached_translation(text, to_lang, from_lang)
         return jsonify({'translated_text': translated_text})
     except Exception as e:
         logger.error(f"Translation error: {str(e)}")
         return jsonify({'error': f'Translation error: {str(e)}'})
 
 @app.route('/save-highlight', methods=['POST'])
-def save_highlight():
+async def save_highlight():
     """Save a highlighted text for review"""
-    article_id = request.form.get('article_id', '')
-    text_to_highlight = request.form.get('text_to_highlight', '')
-    context = request.form.get('context', '')
+    form = await request.form
+    title = form.get('title', '')
+    lang = form.get('lang', 'en')
+    text_to_highlight = form.get('text_to_highlight', '')
+    context = form.get('context', '')
+    
+    # Older clients send a combined article_id (format: title_lang)
+    if not title and form.get('article_id'):
+        article_id = form['article_id']
+        try:
+            title, lang = article_id.rsplit('_', 1)
+        except ValueError:
+            title = article_id
     
     # Check if this is just a retrieval request
-    if article_id and context == 'retrieve_only':
+    if title and context == 'retrieve_only':
         try:
-            # Load existing highlights
-            highlights_data = load_highlights()
-            
-            # Parse article_id (format: title_lang)
-            try:
-                title, lang = article_id.rsplit('_', 1)
-            except ValueError:
-                title = article_id
-                lang = 'en'
-            
-            # Get highlights for this article
-            if title in highlights_data and lang in highlights_data[title]['languages']:
-                article_highlights = highlights_data[title]['languages'][lang]['highlights']
-                return jsonify({'success': True, 'highlights': article_highlights})
-            else:
-                return jsonify({'success': True, 'highlights': []})
-        
+            return jsonify({'success': True, 'highlights': get_article_highlights(title, lang)})
         except Exception as e:
             logger.error(f"Error retrieving highlights: {str(e)}")
             return jsonify({'success': False, 'error': str(e)})
     
     # If not a retrieval request, require text_to_highlight
-    if not article_id or not text_to_highlight:
+    if not title or not text_to_highlight:
         return jsonify({'success': False, 'error': 'Missing required parameters'})
     
     try:
-        # Load existing highlights
-        highlights_data = load_highlights()
-        
-        # Parse article_id (format: title_lang)
-        try:
-            title, lang = article_id.rsplit('_', 1)
-        except ValueError:
-            title = article_id
-            lang = 'en'
-        
-        # Create structure if it doesn't exist
-        if title not in highlights_data:
-            highlights_data[title] = {'languages': {}}
-        
-        if lang not in highlights_data[title]['languages']:
-            highlights_data[title]['languages'][lang] = {
-                'language_name': get_language_name(lang),
-                'highlights': []
-            }
-        
-        # Add the highlight
-        highlights_data[title]['languages'][lang]['highlights'].append({
+        # Append the highlight to the log
+        record = {
+            'title': title,
+            'lang': lang,
             'text': text_to_highlight,
             'context': context,
             'timestamp': int(time.time())
-        })
+        }
         
-        # Save highlights
-        if save_highlights(highlights_data):
+        if await append_highlight(record):
             # Return the updated highlights
-            article_highlights = highlights_data[title]['languages'][lang]['highlights']
-            return jsonify({'success': True, 'highlights': article_highlights})
+            return jsonify({'success': True, 'highlights': get_article_highlights(title, lang)})
         else:
             return jsonify({'success': False, 'error': 'Error saving highlight'})
     except Exception as e:
@@ -244,57 +487,61 @@ def save_highlight():
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/highlights')
-def view_all_highlights():
+async def view_all_highlights():
     """View all highlights/reviews"""
-    highlights_data = load_highlights()
-    return render_template('highlights.html', articles=highlights_data)
+    etag = get_highlights_etag()
+    articles = group_highlights_by_article(load_highlights())
+    return await render_with_etag(etag, 'highlights.html', articles=articles)
 
 @app.route('/export/<title>')
-def export_article(title):
+async def export_article(title):
     """Export article as Word document"""
     lang = request.args.get('lang', 'en')
     include_translations = request.args.get('include_translations', 'false').lower() == 'true'
     translate_to = request.args.get('to_lang', '')
     
     try:
-        # Get article content
-        article = wiki_utils.get_article_content(title, lang)
+        # Get article content (usually already cached by view_article)
+        article, sections = await get_cached_article(title, lang)
         
         if not article:
-            flash('Article not found', 'danger')
+            await flash('Article not found', 'danger')
             return redirect(url_for('home'))
         
-        # Process article content into sections
-        sections = wiki_utils.split_content_into_sections(article['content'])
-        
         # Get translations if needed
         translations = {}
         if include_translations and translate_to:
             try:
-                # Get translation of summary
-                translations['summary'] = wiki_utils.translate_text(article['summary'], translate_to, lang)
+                # Translate the summary and every non-empty section in one batch
+                section_indexes = [i for i, section in enumerate(sections) if section['content']]
+                results = await translate_texts_batched(
+                    [article['summary']] + [sections[i]['content'] for i in section_indexes],
+                    translate_to,
+                    lang
+                )
+                translations['summary'] = results[0]
+                translated_contents = dict(zip(section_indexes, results[1:]))
                 
                 # Get translations of sections
-                translations['sections'] = []
-                for section in sections:
-                    if section['content']:
-                        translated_content = wiki_utils.translate_text(section['content'], translate_to, lang)
-                        translations['sections'].append({
-                            'title': section['title'],
-                            'content': translated_content
-                        })
-                    else:
-                        translations['sections'].append({
-                            'title': section['title'],
-                            'content': ''
-                        })
+                translations['sections'] = [
+                    {
+                        'title': section['title'],
+                        'content': translated_contents.get(i, '')
+                    }
+                    for i, section in enumerate(sections)
+                ]
             except Exception as e:
                 logger.error(f"Translation error: {str(e)}")
                 # Continue without translations if they fail
-                flash(f"Warning: Some translations could not be completed. The document will include partial translations.", 'warning')
+                await flash(f"Warning: Some translations could not be completed. The document will include partial translations.", 'warning')
         
-        # Create Word document
-        doc = Document()
+        # Language labels are used throughout the document; look them up once
+        lang_name = get_language_name(lang)
+        translate_to_name = get_language_name(translate_to) if translate_to else ''
+        translated_heading = f"Translation ({translate_to_name})"
+        
+        # Create Word document from the cached template
+        doc = Document(io.BytesIO(DOCX_TEMPLATE))
         
         # Add title
         doc.add_heading(article['title'], 0)
@@ -303,10 +550,10 @@ def export_article(title):
         doc.add_paragraph(f"Source: {article['url']}")
         
         if include_translations and translate_to:
-            doc.add_paragraph(f"Original Language: {get_language_name(lang)} ({lang})")
-            doc.add_paragraph(f"Translated to: {get_language_name(translate_to)} ({translate_to})")
+            doc.add_paragraph(f"Original Language: {lang_name} ({lang})")
+            doc.add_paragraph(f"Translated to: {translate_to_name} ({translate_to})")
         else:
-            doc.add_paragraph(f"Language: {get_language_name(lang)} ({lang})")
+            doc.add_paragraph(f"Language: {lang_name} ({lang})")
         
         doc.add_paragraph(f"Exported on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
@@ -316,7 +563,7 @@ def export_article(title):
         
         # Add translated summary if available
         if include_translations and translate_to and 'summary' in translations:
-            doc.add_heading(f'Summary (Translated to {get_language_name(translate_to)})', 2)
+            doc.add_heading(f'Summary (Translated to {translate_to_name})', 2)
             doc.add_paragraph(translations['summary'])
         
         # Add content sections
@@ -336,7 +583,6 @@ def export_article(title):
                 
                 # Add a heading for the translation if there's content to translate
                 if section['content'].strip():
-                    translated_heading = f"Translation ({get_language_name(translate_to)})"
                     doc.add_heading(translated_heading, level + 1 if section['title'] else level)
                     
                     # Add the translated content
@@ -345,13 +591,14 @@ def export_article(title):
                     # Add a separator for readability
                     doc.add_paragraph("---")
         
-        # Save to memory
-        file_stream = BytesIO()
+        # Save to a spooled file: small documents stay in RAM, large ones go to disk
+        file_stream = SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)
         doc.save(file_stream)
+        content_length = file_stream.tell()
         file_stream.seek(0)
         
         # Return file for download
-        safe_filename = title.replace('/', '_').replace('\\', '_')
+        safe_filename = UNSAFE_FILENAME_RE.sub('_', title).strip() or 'article'
         
         # Create a filename that indicates if translations are included
         if include_translations and translate_to:
@@ -359,32 +606,23 @@ def export_article(title):
         else:
             download_name = f"{safe_filename}_{lang}.docx"
             
-        return send_file(
-            file_stream,
-            mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            as_attachment=True,
-            download_name=download_name
+        # Stream the file instead of copying it into a single bytes object
+        response = Response(iter_spooled_file(file_stream), mimetype=DOCX_MIMETYPE)
+        response.headers['Content-Length'] = str(content_length)
+        response.headers['Content-Disposition'] = (
+            f"attachment; filename*=UTF-8''{urllib.parse.quote(download_name)}"
         )
+        return response
     except Exception as e:
         logger.error(f"Export error: {str(e)}")
-        flash(f"Error exporting document: {str(e)}", 'danger')
+        await flash(f"Error exporting document: {str(e)}", 'danger')
         return redirect(url_for('view_article', title=title, lang=lang))
 
-
-def keep_alive():
-    while True:
-        try:
-            print("[KeepAlive] Pinging self to stay awake...")
-            requests.get("https://wikitruth.onrender.com/")  # ЗАМЕНИ НА СВОЙ URL!
-        except Exception as e:
-            print("[KeepAlive] Ping failed:", e)
-        time.sleep(600)  # каждые 10 минут
-
 # Error handlers
 @app.errorhandler(404)
-def page_not_found(e):
-    return render_template('404.html'), 404
+async def page_not_found(e):
+    return await render_template('404.html'), 404
 
 @app.errorhandler(500)
-def server_error(e):
-    return render_template('500.html'), 500
+async def server_error(e):
+    return await render_template('500.html'), 500
@@ -1,4 +1,6 @@
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
 
 # Language name mapping
 LANGUAGE_NAMES = {
@@ -18,10 +20,18 @@ LANGUAGE_NAMES = {
     # Add more languages as needed
 }
 
+# Read-only view shared by the app so there is a single language table
+LANGUAGES = MappingProxyType(LANGUAGE_NAMES)
+
+# Bound lookup, avoids the attribute access on every template call
+_lookup_language_name = LANGUAGE_NAMES.get
+
+@lru_cache(maxsize=512)
 def get_language_name(lang_code):
     """Get language name from language code"""
-    return LANGUAGE_NAMES.get(lang_code, lang_code)
+    return _lookup_language_name(lang_code, lang_code)
 
+@lru_cache(maxsize=512)
 def timestamp_to_date(timestamp):
     """Convert Unix timestamp to formatted date string"""
     try:
@@ -1,13 +1,42 @@
 import re
-import threading
+import asyncio
 import urllib.parse
-import requests
+import aiohttp
 import json
+import hashlib
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
+
+# Shared HTTP session so every request reuses the same connection pool
+_http_session = None
+
+async def get_http_session():
+    """Return the shared aiohttp session, creating it on first use"""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession()
+    return _http_session
+
+async def close_http_session():
+    """Close the shared aiohttp session (call on application shutdown)"""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+async def _get_json(url, params=None):
+    """Perform a GET request and decode the JSON body"""
+    session = await get_http_session()
+    async with session.get(url, params=params) as response:
+        return response.status, await response.json(content_type=None)
+
+# Translation requests in flight at once across the whole process, so a long
+# article or a batch of sections doesn't get throttled by the translation API
+MAX_CONCURRENT_TRANSLATIONS = 12
+_translation_slots = asyncio.Semaphore(MAX_CONCURRENT_TRANSLATIONS)
 
 # Simple translation function without external dependencies
-def basic_translate(text, to_lang, from_lang='auto'):
+async def basic_translate(text, to_lang, from_lang='auto'):
     """Basic translation using free web API"""
     if not text or not text.strip():
         return text
@@ -15,10 +44,10 @@ def basic_translate(text, to_lang, from_lang='auto'):
     try:
         # Using Google Translate API for public use (free tier)
         fallback_url = f"https://translate.googleapis.com/translate_a/single?client=gtx&sl={from_lang}&tl={to_lang}&dt=t&q={urllib.parse.quote(text)}"
-        fallback_response = requests.get(fallback_url)
+        async with _translation_slots:
+            status, data = await _get_json(fallback_url)
         
-        if fallback_response.status_code == 200:
-            data = fallback_response.json()
+        if status == 200:
             if isinstance(data, list) and len(data) > 0 and isinstance(data[0], list):
                 translated = ''.join([sentence[0] for sentence in data[0] if isinstance(sentence, list) and len(sentence) > 0])
                 return translated
@@ -32,7 +61,7 @@ def basic_translate(text, to_lang, from_lang='auto'):
         logging.error(f"Translation error: {str(e)}")
         return text
 
-def get_wikipedia_search_results(query, language="en"):
+async def get_wikipedia_search_results(query, language="en"):
     """
     Search Wikipedia for articles matching the query in specified language
     using the MediaWiki API directly
@@ -48,7 +77,7 @@ def get_wikipedia_search_results(query, language="en"):
         return []
     
     try:
-        # Use Wikipedia's API directly via requests
+        # Use Wikipedia's API directly via aiohttp
         url = f"https://{language}.wikipedia.org/w/api.php"
         params = {
             "action": "query",
@@ -58,8 +87,7 @@ def get_wikipedia_search_results(query, language="en"):
             "srlimit": 10
         }
         
-        response = requests.get(url, params=params)
-        data = response.json()
+        _, data = await _get_json(url, params=params)
         
         # Extract titles from the search results
         search_results = [item["title"] for item in data.get("query", {}).get("search", [])]
@@ -68,7 +96,7 @@ def get_wikipedia_search_results(query, language="en"):
         logging.error(f"Error searching Wikipedia: {str(e)}")
         return []
 
-def get_article_content(title, language="en"):
+async def get_article_content(title, language="en"):
     """
     Get the content of a Wikipedia article using the MediaWiki API directly
     
@@ -83,21 +111,21 @@ def get_article_content(title, language="en"):
         return None
     
     try:
-        # Use Wikipedia's API directly via requests
+        # Use Wikipedia's API directly via aiohttp
         url = f"https://{language}.wikipedia.org/w/api.php"
         
-        # First get the summary (extracts)
+        # First get the summary (extracts) and the current revision ID
         summary_params = {
             "action": "query",
             "format": "json",
             "titles": title,
-            "prop": "extracts",
-            "exintro": True,
-            "explaintext": True
+            "prop": "extracts|revisions",
+            "rvprop": "ids",
+            "exintro": 1,
+            "explaintext": 1
         }
         
-        summary_response = requests.get(url, params=summary_params)
-        summary_data = summary_response.json()
+        _, summary_data = await _get_json(url, params=summary_params)
         
         # Extract page ID and summary
         pages = summary_data.get("query", {}).get("pages", {})
@@ -107,6 +135,7 @@ def get_article_content(title, language="en"):
             return None
         
         summary = pages[page_id].get("extract", "No summary available")
+        revision_id = (pages[page_id].get("revisions") or [{}])[0].get("revid")
         
         # Now get the full content
         content_params = {
@@ -114,11 +143,10 @@ def get_article_content(title, language="en"):
             "format": "json",
             "titles": title,
             "prop": "extracts",
-            "explaintext": True
+            "explaintext": 1
         }
         
-        content_response = requests.get(url, params=content_params)
-        content_data = content_response.json()
+        _, content_data = await _get_json(url, params=content_params)
         
         # Extract full content
         content_pages = content_data.get("query", {}).get("pages", {})
@@ -132,13 +160,14 @@ def get_article_content(title, language="en"):
             "title": title,
             "summary": summary,
             "content": content,
-            "url": article_url
+            "url": article_url,
+            "revision_id": revision_id
         }
     except Exception as e:
         logging.error(f"Error retrieving article: {str(e)}")
         return None
 
-def get_available_languages(title, source_lang="en"):
+async def get_available_languages(title, source_lang="en"):
     """
     Get available languages for a Wikipedia article using the MediaWiki API directly
     
@@ -153,7 +182,7 @@ def get_available_languages(title, source_lang="en"):
         return {}
     
     try:
-        # Use Wikipedia's API directly via requests
+        # Use Wikipedia's API directly via aiohttp
         url = f"https://{source_lang}.wikipedia.org/w/api.php"
         params = {
             "action": "query",
@@ -163,8 +192,7 @@ def get_available_languages(title, source_lang="en"):
             "lllimit": 500  # Get many language links
         }
         
-        response = requests.get(url, params=params)
-        data = response.json()
+        _, data = await _get_json(url, params=params)
         
         # Extract language links
         pages = data.get("query", {}).get("pages", {})
@@ -189,7 +217,7 @@ def get_available_languages(title, source_lang="en"):
         # Return at least the source language
         return {source_lang: title}
 
-def get_article_in_language(title, lang):
+async def get_article_in_language(title, lang):
     """
     Get article content in the specified language
     
@@ -200,7 +228,7 @@ def get_article_in_language(title, lang):
     Returns:
         dict: Article content in the specified language
     """
-    return get_article_content(title, lang)
+    return await get_article_content(title, lang)
 
 def split_text_into_chunks(text, chunk_size=800):
     """
@@ -252,7 +280,7 @@ def split_text_into_chunks(text, chunk_size=800):
     
     return chunks
 
-def translate_chunk(chunk, to_lang, from_lang):
+async def translate_chunk(chunk, to_lang, from_lang):
     """
     Translate a single chunk of text using the public translation API
     
@@ -269,17 +297,14 @@ def translate_chunk(chunk, to_lang, from_lang):
     
     try:
         # Use the basic translate function for each chunk
-        return basic_translate(chunk, to_lang, from_lang)
+        return await basic_translate(chunk, to_lang, from_lang)
     except Exception as e:
         logging.warning(f"Error translating chunk: {str(e)}")
         return chunk  # Return original chunk if translation fails
 
-# Thread-safe lock for translation
-translate_lock = threading.Lock()
-
-def translate_text(text, to_lang, from_lang='auto'):
+async def translate_text(text, to_lang, from_lang='auto'):
     """
-    Translate text using multithreaded approach for efficiency
+    Translate text by translating its chunks concurrently
     
     Args:
         text (str): Text to translate
@@ -295,7 +320,7 @@ def translate_text(text, to_lang, from_lang='auto'):
     try:
         # For very short texts, just translate directly without chunking
         if len(text) < 200:  # Reduced threshold to only skip chunking for very small texts
-            return basic_translate(text, to_lang, from_lang)
+            return await basic_translate(text, to_lang, from_lang)
             
         # Split text into smaller chunks for translation
         chunks = split_text_into_chunks(text)
@@ -303,66 +328,63 @@ def translate_text(text, to_lang, from_lang='auto'):
         if not chunks:
             return ""
         
-        # Create a thread pool for concurrent translation
-        translated_chunks = []
-        total_chunks = len(chunks)
-        
-        # Use more workers for faster translation
-        max_workers = min(12, total_chunks)
+        # Translate the chunks concurrently (basic_translate bounds the requests
+        # in flight); gather preserves the original order
+        results = await asyncio.gather(
+            *(translate_chunk(chunk, to_lang, from_lang) for chunk in chunks),
+            return_exceptions=True
+        )
         
-        # We'll use a dict to keep track of the original order
-        chunk_results = {}
+        translated_chunks = []
+        for chunk_index, translated_text in enumerate(results):
+            if isinstance(translated_text, Exception):
+                logging.warning(f"Error with chunk {chunk_index}: {str(translated_text)}")
+                # Keep the original text for failed translations
+                translated_text = chunks[chunk_index]
+            translated_chunks.append(translated_text)
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all translation tasks
-            future_to_chunk = {
-                executor.submit(translate_chunk, chunk, to_lang, from_lang): i 
-                for i, chunk in enumerate(chunks)
-            }
-            
-            # Process results as they complete
-            for i, future in enumerate(as_completed(future_to_chunk)):
-                chunk_index = future_to_chunk[future]
-                try:
-                    # Thread-safe translation
-                    with translate_lock:
-                        translated_text = future.result()
-                    
-                    # Store translated chunks (will sort by index later)
-                    chunk_results[chunk_index] = translated_text
-                    
-                except Exception as e:
-                    logging.warning(f"Error with chunk {chunk_index}: {str(e)}")
-                    # Keep the original text for failed translations
-                    chunk_results[chunk_index] = chunks[chunk_index]
-        
-        # Sort chunks by their original index
-        sorted_chunks = [chunk_results.get(i, chunks[i]) for i in range(total_chunks)]
-        result = ' '.join(sorted_chunks)
-        
-        return result
+        return ' '.join(translated_chunks)
         
     except Exception as e:
         logging.error(f"Translation error: {str(e)}")
         return text  # Return original text if translation fails
 
+# Matches heading patterns like "== Title ==" or "=== Subsection ==="
+HEADING_PATTERN = re.compile(r'^(={2,6})\s*(.*?)\s*\1', re.MULTILINE)
+
+# Split results keyed by a digest of the content, so each article is parsed once
+SECTIONS_CACHE_SIZE = 256
+_sections_cache = OrderedDict()
+
 def split_content_into_sections(content):
     """
     Split Wikipedia content into sections based on headings for better document structuring
     
+    Results are cached by content digest; callers must not mutate the returned list.
+    
     Args:
         content (str): Wikipedia article content
         
     Returns:
         list: List of dictionaries with section titles and content
     """
-    # Find all section headings using regex
-    # This pattern matches heading patterns like "== Title ==" or "=== Subsection ==="
-    heading_pattern = re.compile(r'^(={2,6})\s*(.*?)\s*\1', re.MULTILINE)
+    key = hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+    sections = _sections_cache.get(key)
+    if sections is not None:
+        _sections_cache.move_to_end(key)
+        return sections
     
+    sections = _split_content_into_sections(content)
+    _sections_cache[key] = sections
+    if len(_sections_cache) > SECTIONS_CACHE_SIZE:
+        _sections_cache.popitem(last=False)
+    return sections
+
+def _split_content_into_sections(content):
+    """Parse content into sections (uncached, see split_content_into_sections)"""
     # Find all headings and their positions
     headings = []
-    for match in heading_pattern.finditer(content):
+    for match in HEADING_PATTERN.finditer(content):
         level = len(match.group(1))
         title = match.group(2)
         pos = match.start()
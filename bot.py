@@ -5,7 +5,8 @@ A Telegram bot for searching, viewing, translating, and downloading
 Wikipedia articles in multiple languages.
 """
 
-from bot_new import main
-
 if __name__ == "__main__":
+    # Imported here so document worker processes, which import this script
+    # again as __mp_main__, don't load the whole bot
+    from bot_new import main
     main()
@@ -6,23 +6,39 @@ Wikipedia articles in multiple languages.
 """
 
 import os
+import time
 import asyncio
 import logging
-import json
-import re
+import itertools
 import urllib.parse
 from datetime import datetime
-import tempfile
 import collections.abc
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from types import MappingProxyType
 
 # Monkey patch collections for Python 3.11+
 if not hasattr(collections, 'Hashable'):
     collections.Hashable = collections.abc.Hashable
 
+# telepot.aio grabs the current event loop when it is imported, and newer
+# Python and uvloop versions no longer create one on demand, so set an explicit
+# loop first: uvloop's faster one when available, otherwise asyncio's.
+try:
+    import uvloop
+    asyncio.set_event_loop(uvloop.new_event_loop())
+except ImportError:
+    asyncio.set_event_loop(asyncio.new_event_loop())
+
+import aiohttp
+import aiosqlite
+import orjson
 import telepot
 import telepot.aio
+import telepot.aio.api
 from telepot.aio.loop import MessageLoop
 from telepot.namedtuple import InlineKeyboardMarkup, InlineKeyboardButton
+from cachetools import TTLCache
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -41,8 +57,8 @@ if not TELEGRAM_BOT_TOKEN:
     logger.error("No bot token provided. Set the TELEGRAM_BOT_TOKEN environment variable.")
     exit(1)
 
-# Language settings
-LANGUAGE_NAMES = {
+# Language settings (read-only tables)
+LANGUAGE_NAMES = MappingProxyType({
     'en': 'English',
     'es': 'Spanish',
     'fr': 'French',
@@ -56,9 +72,9 @@ LANGUAGE_NAMES = {
     'hi': 'Hindi',
     'ko': 'Korean',
     'tr': 'Turkish',
-}
+})
 
-POPULAR_LANGUAGES = {
+POPULAR_LANGUAGES = MappingProxyType({
     'en': 'English',
     'es': 'Spanish',
     'fr': 'French', 
@@ -67,10 +83,73 @@ POPULAR_LANGUAGES = {
     'zh': 'Chinese',
     'ar': 'Arabic',
     'ja': 'Japanese'
-}
+})
 
 DEFAULT_LANGUAGE = 'en'
 
+# Languages offered as translation targets
+TRANSLATION_LANGUAGES = ("en", "es", "fr", "de", "it", "pt", "ru", "ja", "zh", "ko", "ar")
+
+# Keep-alive settings (self-ping so the hosting platform doesn't idle us out)
+KEEP_ALIVE_URL = os.environ.get("KEEP_ALIVE_URL", "https://wikitruth.onrender.com/ping")
+KEEP_ALIVE_INTERVAL = 600  # Seconds between pings
+
+# Bot messages
+WELCOME_TEXT = (
+    "🌍 Welcome to WikiSearch Bot!\n\n"
+    "I can help you search, read, and translate Wikipedia articles in multiple languages.\n\n"
+    "Please select a language for your search:"
+)
+
+NEW_SEARCH_TEXT = (
+    "🌍 Start a new search!\n\n"
+    "Please select a language for your search:"
+)
+
+HELP_TEXT = (
+    "📖 *WikiSearch Bot Help*\n\n"
+    "*Commands:*\n"
+    "/start - Start a new search\n"
+    "/help - Show this help message\n"
+    "/cancel - Cancel current operation\n\n"
+    "*How to use:*\n"
+    "1. Select a language for search\n"
+    "2. Enter your search term\n"
+    "3. Select an article from search results\n"
+    "4. Choose what you want to do with the article\n\n"
+    "You can view full articles, see them in other languages, translate them, "
+    "or download them as documents."
+)
+
+NO_RESULTS_TEMPLATE = (
+    "No results found for '{query}' in {language_name}.\n\n"
+    "Would you like to try a different search or change the language?"
+)
+
+# Message length limits (Telegram allows 4096 characters per message)
+SUMMARY_LIMIT = 1000
+MESSAGE_LIMIT = 4000
+
+# Outgoing message settings (Telegram allows about 30 messages per second per bot)
+SEND_RATE = 30  # Bot API calls per second
+SEND_MIN_RATE = 1  # Lowest rate to back off to after flood errors
+SEND_RATE_STEP = 0.5  # Rate regained after each successful call
+SEND_CONCURRENCY = 25  # Bot API calls in flight at once
+MESSAGE_EDIT_WINDOW = 48 * 3600  # Seconds a sent message can still be edited
+UNEDITABLE_MAX_MESSAGES = 10_000  # Messages remembered as not editable
+UNEDITABLE_ERRORS = ("message can't be edited", "message to edit not found")
+SENT_EDITS_TTL = 3600  # Seconds to remember a message's newest sent edit; far longer than any retry_after
+TELEGRAM_POOL_SIZE = 100  # Keep-alive connections to the Bot API
+
+# Per-chat update workers
+CHAT_WORKER_IDLE_TIMEOUT = 60  # Seconds a chat's worker waits for updates before exiting
+
+# Callbacks that only redraw their own message. If a newer tap on the same
+# message is already queued, they are skipped since it would redraw it anyway.
+REDRAW_CALLBACKS = frozenset({
+    "section", "trans_section", "translate_section", "back_to_article", "back_to_translation"
+})
+
 # Constants for callback query data prefixes
 CB_LANGUAGE = "lang"
 CB_ARTICLE = "article"
@@ -78,73 +157,531 @@ CB_ACTION = "action"
 CB_VIEW_LANG = "view_lang"
 CB_TRANSLATE = "translate"
 
-# Global state storage
-USER_STATE = {}  # Store user states by chat_id
-USER_DATA = {}   # Store user data by chat_id
+# Callback data for the article action menu
+CB_ACTION_READ = f"{CB_ACTION}:read"
+CB_ACTION_LANGUAGES = f"{CB_ACTION}:languages"
+CB_ACTION_TRANSLATE = f"{CB_ACTION}:translate"
+CB_ACTION_DOWNLOAD = f"{CB_ACTION}:download"
+CB_ACTION_LINK = f"{CB_ACTION}:link"
+
+# Session settings
+SESSION_MAX_CHATS = 100_000
+SESSION_TTL = 3600  # Seconds an idle chat keeps its session
+SESSION_DB_PATH = os.environ.get("SESSION_DB_PATH", "sessions.db")
+SESSION_FLUSH_INTERVAL = 0.25  # Seconds between batched session writes
+SESSION_PRUNE_INTERVAL = 600  # Seconds between deletions of expired stored sessions
+
+@dataclass(frozen=True, slots=True)
+class CallbackQuery:
+    """The fields of a callback query update the handlers use, read from the update once"""
+    query_id: str
+    chat_id: int
+    message_id: int
+    data: str
+    editable: bool  # Whether the message can still take a text edit
+
+@dataclass(slots=True)
+class UserSession:
+    """State and data the bot keeps for one chat"""
+    state: str = "START"
+    language: str = DEFAULT_LANGUAGE
+    search_query: str = ""
+    current_article: dict | None = None
+    article_sections: list = field(default_factory=list)
+    current_section: int = 0
+    translated_article: dict | None = None
+    translation_language: str = DEFAULT_LANGUAGE
+    translated_sections: list = field(default_factory=list)
+    current_translated_section: int = 0
+    pending_articles: dict | None = None  # Stored article references not fetched again yet, after a restart
+
+# Global session storage (bounded, idle chats expire)
+SESSIONS = TTLCache(maxsize=SESSION_MAX_CHATS, ttl=SESSION_TTL)
+
+def get_user_session(chat_id):
+    """Get the session for a chat, creating it on first touch"""
+    session = SESSIONS.get(chat_id)
+    if session is None:
+        session = UserSession()
+    
+    # Re-inserting restarts the TTL, so only idle chats expire
+    SESSIONS[chat_id] = session
+    return session
+
+def touch_user_session(chat_id, session):
+    """
+    Restart a chat's session TTL after an update has changed it
+    
+    Changing a session in place doesn't restart its TTL, and an update that
+    awaits for a long time could see the entry expire under it, so the
+    session is put back unless the update replaced it with a new one.
+    """
+    SESSIONS[chat_id] = SESSIONS.get(chat_id, session)
+
+# Session fields holding article data, which is stored by title and fetched
+# again when a tap first needs it rather than written out with every update
+ARTICLE_SESSION_FIELDS = frozenset({
+    "current_article", "article_sections", "translated_article", "translated_sections", "pending_articles"
+})
+
+# Callbacks that start over or pick a new article, so never need the stored one
+ARTICLELESS_CALLBACKS = frozenset({CB_LANGUAGE, CB_ARTICLE, "new_search", "try_again"})
+
+# Callbacks that show or use the chat's translation
+TRANSLATION_CALLBACKS = frozenset({
+    "trans_section", "read_translation", "download_translation", "back_to_translation"
+})
+
+# Callbacks after which a stored translation no longer matches the article
+TRANSLATION_REPLACING_CALLBACKS = frozenset({CB_VIEW_LANG, CB_TRANSLATE})
+
+def session_record(session):
+    """The stored form of a session: its navigation state, with the article by title"""
+    record = {f.name: getattr(session, f.name) for f in fields(UserSession) if f.name not in ARTICLE_SESSION_FIELDS}
+    
+    # References not fetched again since a restart are stored as they were loaded
+    pending = session.pending_articles or {}
+    article = session.current_article
+    record['article_title'] = article['title'] if article else pending.get('article_title')
+    record['reading_article'] = bool(session.article_sections or pending.get('reading_article'))
+    record['translated'] = session.translated_article is not None or bool(pending.get('translated'))
+    record['reading_translation'] = bool(session.translated_sections or pending.get('reading_translation'))
+    return record
+
+def restore_session(record):
+    """
+    Rebuild a session's navigation state from its stored form
+    
+    The article and translation it refers to are kept in pending_articles and
+    only fetched by restore_session_articles, once a tap needs them.
+    """
+    # Ignore stored fields the current UserSession no longer has
+    known = {f.name for f in fields(UserSession)} - ARTICLE_SESSION_FIELDS
+    session = UserSession(**{k: v for k, v in record.items() if k in known})
+    
+    if record.get('article_title'):
+        keys = ('article_title', 'reading_article', 'translated', 'reading_translation')
+        session.pending_articles = {k: record[k] for k in keys if record.get(k)}
+    return session
+
+async def restore_session_articles(session, translation=False):
+    """Fetch the article (and, if asked, the translation) a restored session refers to"""
+    pending = session.pending_articles
+    if not pending:
+        session.pending_articles = None
+        return
+    
+    title = pending.pop('article_title', None)
+    if title:
+        article = await get_wikipedia_article(title, session.language)
+        if article:
+            session.current_article = article
+            if pending.pop('reading_article', False):
+                session.article_sections = article['sections']
+    pending.pop('reading_article', None)
+    
+    if session.current_article is None:
+        # Nothing to translate without the article
+        pending.clear()
+    elif translation and pending.pop('translated', False):
+        translated_article = await translate_article(
+            session.current_article, session.language, session.translation_language
+        )
+        if translated_article:
+            session.translated_article = translated_article
+            if pending.get('reading_translation'):
+                session.translated_sections = split_content_into_sections(translated_article['content'])
+        pending.pop('reading_translation', None)
+    
+    if not pending:
+        session.pending_articles = None
+
+class SessionStore:
+    """
+    SQLite backing for SESSIONS, so sessions survive a restart
+    
+    Sessions are loaded lazily, the first time a chat sends an update.
+    Changed sessions are marked dirty and written together every
+    SESSION_FLUSH_INTERVAL seconds instead of once per update. Only the
+    small navigation state is written, and only when it changed (or the row
+    is getting old); articles are fetched again when a session is restored.
+    Rows idle for longer than SESSION_TTL are deleted every
+    SESSION_PRUNE_INTERVAL seconds, like the sessions in SESSIONS expire.
+    """
+    def __init__(self, path=SESSION_DB_PATH, flush_interval=SESSION_FLUSH_INTERVAL):
+        self.path = path
+        self._flush_interval = flush_interval
+        self._db = None
+        self._dirty = set()
+        self._saved = TTLCache(maxsize=SESSION_MAX_CHATS, ttl=SESSION_TTL)  # chat_id -> (blob, time) last stored
+        self._flusher = None
+    
+    async def open(self):
+        """Open the database and start the background flush"""
+        self._db = await aiosqlite.connect(self.path)
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA synchronous=NORMAL")
+        await self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "chat_id INTEGER PRIMARY KEY, blob BLOB NOT NULL, updated INTEGER NOT NULL)"
+        )
+        await self._db.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated)")
+        await self._db.commit()
+        await self.prune()
+        self._flusher = asyncio.create_task(self._run())
+    
+    async def load(self, chat_id):
+        """Put a chat's stored session into SESSIONS if it isn't there yet"""
+        if chat_id in SESSIONS:
+            return
+        
+        try:
+            async with self._db.execute(
+                "SELECT blob, updated FROM sessions WHERE chat_id = ? AND updated >= ?",
+                (chat_id, int(time.time()) - SESSION_TTL)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return
+            
+            SESSIONS[chat_id] = restore_session(orjson.loads(row[0]))
+            self._saved[chat_id] = (row[0], row[1])
+        except Exception as e:
+            logger.error(f"Error loading session for chat {chat_id}: {str(e)}")
+    
+    def mark_dirty(self, chat_id):
+        """Schedule a chat's session to be written with the next batch"""
+        self._dirty.add(chat_id)
+    
+    async def flush(self):
+        """Write all dirty sessions that changed in one transaction"""
+        if not self._dirty:
+            return
+        
+        dirty, self._dirty = self._dirty, set()
+        now = int(time.time())
+        rows = []
+        for chat_id in dirty:
+            session = SESSIONS.get(chat_id)
+            if session is None:
+                continue
+            
+            # Skip sessions stored as they are, unless the row is halfway to being pruned
+            blob = orjson.dumps(session_record(session))
+            saved = self._saved.get(chat_id)
+            if saved is not None and saved[0] == blob and now - saved[1] < SESSION_TTL // 2:
+                continue
+            
+            rows.append((chat_id, blob, now))
+        if not rows:
+            return
+        
+        try:
+            await self._db.executemany(
+                "INSERT INTO sessions (chat_id, blob, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(chat_id) DO UPDATE SET blob = excluded.blob, updated = excluded.updated",
+                rows
+            )
+            await self._db.commit()
+            for chat_id, blob, updated in rows:
+                self._saved[chat_id] = (blob, updated)
+        except Exception as e:
+            logger.error(f"Error saving sessions: {str(e)}")
+    
+    async def prune(self):
+        """Delete stored sessions that have been idle for longer than SESSION_TTL"""
+        try:
+            await self._db.execute("DELETE FROM sessions WHERE updated < ?", (int(time.time()) - SESSION_TTL,))
+            await self._db.commit()
+        except Exception as e:
+            logger.error(f"Error pruning sessions: {str(e)}")
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_prune = loop.time() + SESSION_PRUNE_INTERVAL
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+            if loop.time() >= next_prune:
+                next_prune = loop.time() + SESSION_PRUNE_INTERVAL
+                await self.prune()
+    
+    async def close(self):
+        """Stop the background flush, write what's left and close the database"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        if self._db is not None:
+            await self.flush()
+            await self._db.close()
+            self._db = None
+
+# Process-wide caches for Wikipedia lookups, shared by all chats
+WIKI_CACHE_SIZE = 4096
+WIKI_CACHE_TTL = 600  # Seconds
+search_cache = TTLCache(maxsize=WIKI_CACHE_SIZE, ttl=WIKI_CACHE_TTL)   # (query, lang) -> result titles
+article_cache = TTLCache(maxsize=WIKI_CACHE_SIZE, ttl=WIKI_CACHE_TTL)  # (title, lang) -> article
+_inflight_articles = {}  # (title, lang) -> task fetching it, shared by concurrent lookups
+TRANSLATION_CACHE_SIZE = 1024
+TRANSLATION_CACHE_TTL = 3600  # Seconds
+translated_article_cache = TTLCache(maxsize=TRANSLATION_CACHE_SIZE, ttl=TRANSLATION_CACHE_TTL)  # (title, from, to) -> article
+_inflight_translations = {}  # (title, from, to) -> task translating it
+_inflight_documents = {}  # (url, title, lang) -> task building the document
+translation_message_cache = TTLCache(maxsize=TRANSLATION_CACHE_SIZE, ttl=TRANSLATION_CACHE_TTL)  # (translated title, from, to) -> message
 
 # Import wiki utils functions
 from wiki_utils import (
     get_wikipedia_search_results,
     get_article_content,
     get_available_languages,
-    get_article_in_language,
     translate_text,
+    translate_texts,
     split_content_into_sections
 )
 
-from document_generator import create_document_from_article
+from document_generator import create_document_bytes_async, safe_filename
 
 # Utility functions
+@lru_cache(maxsize=512)
 def get_language_name(lang_code):
     """Get language name from language code"""
-    return LANGUAGE_NAMES.get(lang_code, lang_code.upper())
+    return LANGUAGE_NAMES.get(lang_code) or lang_code.upper()
 
-def search_wikipedia(query, language="en"):
-    """Search Wikipedia for articles in the specified language"""
-    return get_wikipedia_search_results(query, language)
+# Precomputed button labels and buttons, shared by every keyboard that shows them
+LANG_LABELS = {lang_code: f"{lang_name} ({lang_code})" for lang_code, lang_name in LANGUAGE_NAMES.items()}
+TRANSLATE_BUTTONS = {
+    lang_code: InlineKeyboardButton(text=get_language_name(lang_code), callback_data=f"{CB_TRANSLATE}:{lang_code}")
+    for lang_code in TRANSLATION_LANGUAGES
+}
 
-def get_wikipedia_article(title, language="en"):
-    """Get article content from Wikipedia"""
-    # Get article content
-    article = get_article_content(title, language)
+def build_button_grid(buttons, per_row=2):
+    """Arrange buttons into keyboard rows of per_row buttons each"""
+    return [buttons[i:i + per_row] for i in range(0, len(buttons), per_row)]
+
+def _jsonable(value):
+    """Convert telepot namedtuples to plain lists and dicts, dropping unset fields"""
+    if isinstance(value, list):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, tuple) and hasattr(value, '_asdict'):
+        return {key: _jsonable(item) for key, item in value._asdict().items() if item is not None}
+    return value
+
+def serialize_markup(markup):
+    """
+    Serialize reply markup to a JSON string once.
     
-    if not article:
-        return None
+    telepot passes string parameters through untouched, so a pre-serialized
+    keyboard skips its per-request make_jsonable and json.dumps steps.
+    """
+    return orjson.dumps(_jsonable(markup)).decode()
+
+def _build_article_actions_keyboard(has_other_languages):
+    """Build the article action menu"""
+    keyboard = [[InlineKeyboardButton(text="Read Full Article", callback_data=CB_ACTION_READ)]]
+    if has_other_languages:
+        keyboard.append([InlineKeyboardButton(text="View in Another Language", callback_data=CB_ACTION_LANGUAGES)])
+    keyboard += [
+        [InlineKeyboardButton(text="Translate Article", callback_data=CB_ACTION_TRANSLATE)],
+        [InlineKeyboardButton(text="Download as Document", callback_data=CB_ACTION_DOWNLOAD)],
+        [InlineKeyboardButton(text="Copy Wikipedia Link", callback_data=CB_ACTION_LINK)],
+        [InlineKeyboardButton(text="New Search", callback_data="new_search")]
+    ]
+    return serialize_markup(InlineKeyboardMarkup(inline_keyboard=keyboard))
+
+def _build_translate_keyboard(source_lang):
+    """Build the translation target grid, leaving out the source language"""
+    buttons = [
+        button for lang_code, button in TRANSLATE_BUTTONS.items() if lang_code != source_lang
+    ]
+    keyboard = build_button_grid(buttons)
+    keyboard.append([InlineKeyboardButton(text="Back to Article", callback_data="back_to_article")])
+    return serialize_markup(InlineKeyboardMarkup(inline_keyboard=keyboard))
+
+# Static keyboards, built and serialized once since their buttons never change
+LANGUAGE_KEYBOARD = serialize_markup(InlineKeyboardMarkup(inline_keyboard=build_button_grid([
+    InlineKeyboardButton(text=LANG_LABELS[lang_code], callback_data=f"{CB_LANGUAGE}:{lang_code}")
+    for lang_code in POPULAR_LANGUAGES
+])))
+
+# Keyed by whether the article exists in other languages
+ARTICLE_ACTIONS_KEYBOARDS = {
+    has_other_languages: _build_article_actions_keyboard(has_other_languages)
+    for has_other_languages in (False, True)
+}
+
+# Keyed by the article's language; other languages get the full grid
+TRANSLATE_KEYBOARDS = {
+    lang_code: _build_translate_keyboard(lang_code) for lang_code in TRANSLATION_LANGUAGES
+}
+TRANSLATE_KEYBOARD_ALL = _build_translate_keyboard(None)
+
+TRANSLATION_ACTIONS_KEYBOARD = serialize_markup(InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="Read Full Translation", callback_data="read_translation")],
+    [InlineKeyboardButton(text="Download Translation", callback_data="download_translation")],
+    [InlineKeyboardButton(text="Back to Original Article", callback_data="back_to_article")],
+    [InlineKeyboardButton(text="New Search", callback_data="new_search")]
+]))
+
+NO_RESULTS_KEYBOARD = serialize_markup(InlineKeyboardMarkup(inline_keyboard=[[
+    InlineKeyboardButton(text="Try Different Search", callback_data="try_again"),
+    InlineKeyboardButton(text="Change Language", callback_data="new_search")
+]]))
+
+ARTICLE_NOT_FOUND_KEYBOARD = serialize_markup(InlineKeyboardMarkup(inline_keyboard=[[
+    InlineKeyboardButton(text="Try again", callback_data="try_again"),
+    InlineKeyboardButton(text="New search", callback_data="new_search")
+]]))
+
+BACK_TO_ARTICLE_KEYBOARD = serialize_markup(InlineKeyboardMarkup(inline_keyboard=[[
+    InlineKeyboardButton(text="Back to Article", callback_data="back_to_article")
+]]))
+
+BACK_TO_TRANSLATION_KEYBOARD = serialize_markup(InlineKeyboardMarkup(inline_keyboard=[[
+    InlineKeyboardButton(text="Back to Translation", callback_data="back_to_translation")
+]]))
+
+@lru_cache(maxsize=1024)
+def section_translate_keyboard(section_index, source_lang):
+    """Get the section translation grid, leaving out the source language"""
+    keyboard = build_button_grid([
+        InlineKeyboardButton(
+            text=get_language_name(lang_code),
+            callback_data=f"section_translate:{section_index}:{lang_code}"
+        )
+        for lang_code in TRANSLATION_LANGUAGES if lang_code != source_lang
+    ])
+    keyboard.append([InlineKeyboardButton(text="Back to Section", callback_data=f"section:{section_index}")])
+    return serialize_markup(InlineKeyboardMarkup(inline_keyboard=keyboard))
+
+@lru_cache(maxsize=1024)
+def section_back_keyboard(section_index):
+    """Get the single button leading back to an original section"""
+    return serialize_markup(InlineKeyboardMarkup(inline_keyboard=[[
+        InlineKeyboardButton(text="Back to Section", callback_data=f"section:{section_index}")
+    ]]))
+
+@lru_cache(maxsize=1024)
+def translated_section_keyboard(section_index):
+    """Get the back buttons shown under a translated section"""
+    return serialize_markup(InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="Back to Original Section", callback_data=f"section:{section_index}")],
+        [InlineKeyboardButton(text="Back to Article", callback_data="back_to_article")]
+    ]))
+
+@lru_cache(maxsize=1024)
+def translated_section_nav_keyboard(section_index, section_count):
+    """Get the previous/next navigation for a section of a translated article"""
+    nav_row = []
+    if section_index > 0:
+        nav_row.append(InlineKeyboardButton(text="◀️ Previous", callback_data=f"trans_section:{section_index-1}"))
+    if section_index < section_count - 1:
+        nav_row.append(InlineKeyboardButton(text="Next ▶️", callback_data=f"trans_section:{section_index+1}"))
     
-    # Get available languages for this article
-    available_languages = get_available_languages(title, language)
+    keyboard = [nav_row] if nav_row else []
+    keyboard.append([InlineKeyboardButton(text="Back to Translation", callback_data="back_to_translation")])
+    return serialize_markup(InlineKeyboardMarkup(inline_keyboard=keyboard))
+
+@lru_cache(maxsize=1024)
+def translation_label(source_lang, target_lang):
+    """Get the 'Translated from X to Y' caption for a language pair"""
+    return f"Translated from {get_language_name(source_lang)} to {get_language_name(target_lang)}"
+
+def article_actions_keyboard(available_languages):
+    """Get the action menu for an article with the given language links"""
+    return ARTICLE_ACTIONS_KEYBOARDS[bool(available_languages) and len(available_languages) > 1]
+
+async def search_wikipedia(query, language="en"):
+    """Search Wikipedia for articles in the specified language"""
+    key = (query, language)
+    cached = search_cache.get(key)
+    if cached is not None:
+        return cached
     
-    # Add available languages to article data
-    article['available_languages'] = available_languages
+    search_results = await asyncio.to_thread(get_wikipedia_search_results, query, language)
+    if search_results:
+        search_cache[key] = search_results
+    return search_results
+
+def is_article_cached(title, language):
+    """Check whether an article can be served without fetching it"""
+    return (title, language) in article_cache
+
+def run_shared(inflight, key, func, *args):
+    """
+    Run func(*args) as one task per key, joined by every concurrent caller
     
-    return article
+    Args:
+        inflight (dict): Running tasks by key, for this kind of work
+        key: Identifies the work, e.g. (title, lang)
+        func: Coroutine function doing the work
+        
+    Returns:
+        An awaitable for the task's result, shielded so one caller giving up
+        doesn't cancel the work for the others
+    """
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(func(*args))
+        inflight[key] = task
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    return asyncio.shield(task)
+
+async def get_wikipedia_article(title, language="en", known_languages=None):
+    """Get article content from Wikipedia, fetching only on a cache miss"""
+    key = (title, language)
+    cached = article_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    # Join the fetch already running for this article, if any
+    return await run_shared(_inflight_articles, key, _fetch_wikipedia_article, title, language, known_languages)
 
-def get_article_in_other_language(title, target_lang):
-    """Get the article in another available language"""
-    # Get article in the target language
-    article = get_article_in_language(title, target_lang)
+async def _fetch_wikipedia_article(title, language, known_languages=None):
+    """Fetch an article and its language links, and cache the result"""
+    if known_languages:
+        # Language links are the same from every language version of an article
+        article = await asyncio.to_thread(get_article_content, title, language)
+        available_languages = known_languages
+    else:
+        # Fetch the content and the language links concurrently
+        article, available_languages = await asyncio.gather(
+            asyncio.to_thread(get_article_content, title, language),
+            asyncio.to_thread(get_available_languages, title, language)
+        )
     
     if not article:
         return None
     
-    # Get available languages for this article
-    available_languages = get_available_languages(title, target_lang)
-    
     # Add available languages to article data
     article['available_languages'] = available_languages
     
+    # Split into sections once, so every reader of the cached article shares them
+    article['sections'] = split_content_into_sections(article['content'])
+    article['share_url'] = get_article_sharing_link(article['title'], language)
+    article['summary_message'] = format_article_message(article, language)
+    
+    article_cache[(title, language)] = article
     return article
 
+async def get_article_in_other_language(title, target_lang, known_languages=None):
+    """Get the article in another available language, reusing its known language links"""
+    # Same fetch (and cache entry) as any other article lookup
+    return await get_wikipedia_article(title, target_lang, known_languages)
+
 def translate_article_content(article, from_lang, to_lang):
     """Translate article content from one language to another"""
     if not article:
         return None
     
+    # Already in the target language
+    if from_lang == to_lang:
+        return article
+    
     try:
-        # Translate title, summary, and content
-        translated_title = translate_text(article['title'], to_lang, from_lang)
-        translated_summary = translate_text(article['summary'], to_lang, from_lang)
-        translated_content = translate_text(article['content'], to_lang, from_lang)
+        # Translate title, summary, and content in one batch
+        translated_title, translated_summary, translated_content = translate_texts(
+            [article['title'], article['summary'], article['content']], to_lang, from_lang
+        )
         
         # Create translated article object
         translated_article = {
@@ -160,6 +697,70 @@ def translate_article_content(article, from_lang, to_lang):
         logger.error(f"Translation error: {str(e)}")
         return None
 
+def is_translation_cached(article, from_lang, to_lang):
+    """Check whether an article translation can be served without translating it"""
+    return from_lang == to_lang or (article['title'], from_lang, to_lang) in translated_article_cache
+
+async def translate_article(article, from_lang, to_lang):
+    """Translate an article off the event loop, reusing earlier translations"""
+    key = (article['title'], from_lang, to_lang)
+    cached = translated_article_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    # Join the translation already running for this article, e.g. after a double tap
+    return await run_shared(_inflight_translations, key, _translate_and_cache, article, from_lang, to_lang)
+
+async def _translate_and_cache(article, from_lang, to_lang):
+    """Translate an article in a worker thread and cache the result"""
+    translated_article = await asyncio.to_thread(translate_article_content, article, from_lang, to_lang)
+    if translated_article:
+        translated_article_cache[(article['title'], from_lang, to_lang)] = translated_article
+    return translated_article
+
+async def build_document(article, language):
+    """Generate an article document off the event loop; returns (filename, data) or None"""
+    # Built straight into memory, so there is no temp file to read back or clean up.
+    # A translation keeps its original's URL, so the title tells the two apart
+    key = (article['url'], article['title'], language)
+    data = await run_shared(_inflight_documents, key, create_document_bytes_async, article, language)
+    
+    if not data:
+        return None
+    
+    return f"{safe_filename(article['title'])}.docx", data
+
+# Single-character ellipsis, so a cut keeps two more characters of the text
+ELLIPSIS = "…"
+
+def truncate_text(text, limit):
+    """Shorten text to at most limit characters, ending with an ellipsis when cut"""
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1] + ELLIPSIS
+
+def format_article_message(article, language):
+    """Format the summary message shown above the article action menu"""
+    return (
+        f"📚 *{article['title']}*\n\n"
+        f"{truncate_text(article['summary'], SUMMARY_LIMIT)}\n\n"
+        f"_Language: {get_language_name(language)}_"
+    )
+
+def format_translation_message(translated_article, source_lang, target_lang):
+    """Format the translated summary shown above the translation action menu, rendering it once per translation"""
+    key = (translated_article['title'], source_lang, target_lang)
+    message = translation_message_cache.get(key)
+    if message is None:
+        message = translation_message_cache[key] = (
+            f"📚 *{translated_article['title']}*\n\n"
+            f"{translation_label(source_lang, target_lang)}:\n\n"
+            f"{truncate_text(translated_article['summary'], SUMMARY_LIMIT)}\n\n"
+            f"_Note: This is a machine translation and may not be perfect._"
+        )
+    return message
+
+@lru_cache(maxsize=8192)
 def get_article_sharing_link(title, lang):
     """Generate a Wikipedia sharing link for the article"""
     try:
@@ -172,24 +773,344 @@ def get_article_sharing_link(title, lang):
         logger.error(f"Error generating article link: {str(e)}")
         return None
 
+async def keep_alive():
+    """Periodically ping KEEP_ALIVE_URL so the host keeps the service awake"""
+    # One session for the lifetime of the loop so the connection is pooled
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                logger.debug("[KeepAlive] Pinging self to stay awake...")
+                # HEAD against a static route: no body, no template rendering
+                async with session.head(KEEP_ALIVE_URL):
+                    pass
+            except Exception as e:
+                logger.warning(f"[KeepAlive] Ping failed: {str(e)}")
+            await asyncio.sleep(KEEP_ALIVE_INTERVAL)
+
+async def configure_telegram_pool():
+    """Replace telepot's default 10-connection pool with a larger keep-alive one"""
+    # telepot.aio sends every Bot API call (including the long-polling
+    # getUpdates) through this one session, so its connection limit caps
+    # how many calls can be in flight at once
+    old_session = telepot.aio.api._pools['default']
+    telepot.aio.api._pools['default'] = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=TELEGRAM_POOL_SIZE,
+            ttl_dns_cache=300,
+            keepalive_timeout=75
+        )
+    )
+    await old_session.close()
+
+class SendQueue:
+    """
+    Rate-limited queue for outgoing Telegram messages and edits
+    
+    Calls leave the queue at no more than SEND_RATE per second. An edit of a
+    message that already has an edit waiting in the queue replaces it, so
+    superseded text (e.g. a "Loading..." notice) is never sent, and edits of
+    one message are sent one after another, so an older text can't land last.
+    
+    When Telegram answers "too many requests", the rate is halved, sending
+    pauses for the retry_after it asked for and the call is queued again in
+    its original place, ahead of every call queued after it. An edit is not
+    retried if a newer edit of the same message has been sent meanwhile, so
+    stale text can't overwrite it. Each successful call then raises the rate
+    by SEND_RATE_STEP until it is back at SEND_RATE.
+    """
+    def __init__(self, bot, rate=SEND_RATE, concurrency=SEND_CONCURRENCY):
+        self.bot = bot
+        self._max_rate = rate
+        self._rate = rate
+        self._slots = asyncio.Semaphore(concurrency)
+        self._resume_at = 0  # Loop time to hold sending until, after a flood error
+        self._queue = asyncio.PriorityQueue()  # (sequence number, call), oldest call first
+        self._sequence = itertools.count()
+        self._pending_edits = {}  # (chat_id, message_id) -> queued edit
+        self._sent_edits = TTLCache(maxsize=UNEDITABLE_MAX_MESSAGES, ttl=SENT_EDITS_TTL)  # (chat_id, message_id) -> sequence number of the newest edit sent
+        self._uneditable = TTLCache(maxsize=UNEDITABLE_MAX_MESSAGES, ttl=MESSAGE_EDIT_WINDOW)
+        self._edits_in_flight = {}  # (chat_id, message_id) -> task sending its newest edit
+        self._calls = set()
+        self._worker = None
+    
+    async def send_message(self, *args, **kwargs):
+        """Queue a sendMessage call and wait for the sent message"""
+        return await self.submit('sendMessage', *args, **kwargs)
+    
+    async def edit_message_text(self, msg_identifier, *args, **kwargs):
+        """Queue an editMessageText call, replacing any queued edit of the same message"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue_edit(msg_identifier, args, kwargs, [future])
+        return await future
+    
+    def post_edit(self, msg_identifier, *args, **kwargs):
+        """
+        Queue an editMessageText call without waiting for it; failures are only logged
+        
+        For interim notices like "Loading...": the handler can start the real
+        work at once, and if its final edit is queued before the notice goes
+        out, the notice is never sent.
+        """
+        self._queue_edit(msg_identifier, args, kwargs, [])
+    
+    def _queue_edit(self, msg_identifier, args, kwargs, futures):
+        pending = self._pending_edits.get(msg_identifier)
+        if pending is not None:
+            # Not sent yet: send the newer text instead, and answer both callers
+            pending[1] = (msg_identifier, *args)
+            pending[2] = kwargs
+            pending[3].extend(futures)
+        else:
+            pending = ['editMessageText', (msg_identifier, *args), kwargs, futures]
+            self._pending_edits[msg_identifier] = pending
+            self._enqueue(pending)
+    
+    def post_message(self, *args, **kwargs):
+        """Queue a sendMessage call without waiting for it; failures are only logged"""
+        self._enqueue(['sendMessage', args, kwargs, []])
+    
+    def mark_uneditable(self, msg_identifier):
+        """Remember that a message can't be edited, so edit_or_send goes straight to sending"""
+        self._uneditable[msg_identifier] = True
+    
+    async def edit_or_send(self, msg_identifier, *args, **kwargs):
+        """Edit a message, or send a new one if it can't be edited (e.g. too old)"""
+        if msg_identifier in self._uneditable:
+            return await self.send_message(msg_identifier[0], *args, **kwargs)
+        
+        try:
+            return await self.edit_message_text(msg_identifier, *args, **kwargs)
+        except telepot.exception.TelegramError as e:
+            if any(error in str(e.description).lower() for error in UNEDITABLE_ERRORS):
+                self.mark_uneditable(msg_identifier)
+            return await self.send_message(msg_identifier[0], *args, **kwargs)
+    
+    async def submit(self, method, *args, **kwargs):
+        """Queue a Bot API call and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue([method, args, kwargs, [future]])
+        return await future
+    
+    def _enqueue(self, item):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+        self._queue.put_nowait((next(self._sequence), item))
+    
+    def _requeue(self, seq, item):
+        """Queue a call again after a flood error, in its original place"""
+        if item[0] == 'editMessageText':
+            msg_identifier = item[1][0]
+            if self._sent_edits.get(msg_identifier, -1) > seq:
+                # A newer edit of this message has already been sent; retrying
+                # would put the older text back
+                for future in item[3]:
+                    if not future.done():
+                        future.set_result(None)
+                return
+            
+            pending = self._pending_edits.get(msg_identifier)
+            if pending is not None:
+                # A newer edit of this message is already queued; it answers these callers too
+                pending[3].extend(item[3])
+                return
+            self._pending_edits[msg_identifier] = item
+        self._queue.put_nowait((seq, item))
+    
+    async def _run(self):
+        """Start queued calls one interval apart"""
+        loop = asyncio.get_running_loop()
+        while True:
+            # Only take the next call once it can be sent, so a call retried
+            # in the meantime still goes out in its original place
+            await self._slots.acquire()
+            seq, item = await self._queue.get()
+            
+            # Hold off while Telegram has asked us to wait
+            delay = self._resume_at - loop.time()
+            if delay > 0:
+                self._queue.put_nowait((seq, item))
+                self._slots.release()
+                await asyncio.sleep(delay)
+                continue
+            
+            previous_edit = None
+            if item[0] == 'editMessageText':
+                # From here on, newer edits of this message queue separately
+                msg_identifier = item[1][0]
+                self._pending_edits.pop(msg_identifier, None)
+                self._sent_edits[msg_identifier] = seq
+                previous_edit = self._edits_in_flight.get(msg_identifier)
+            
+            # Don't wait for the response; only the start rate and calls in flight are limited
+            task = asyncio.create_task(self._call(seq, *item, after=previous_edit))
+            self._calls.add(task)
+            task.add_done_callback(self._calls.discard)
+            if item[0] == 'editMessageText':
+                self._edits_in_flight[msg_identifier] = task
+                task.add_done_callback(lambda done, key=msg_identifier: self._edit_done(key, done))
+            await asyncio.sleep(1 / self._rate)
+    
+    def _edit_done(self, msg_identifier, task):
+        if self._edits_in_flight.get(msg_identifier) is task:
+            del self._edits_in_flight[msg_identifier]
+    
+    async def _call(self, seq, method, args, kwargs, futures, after=None):
+        try:
+            if after is not None:
+                # An earlier edit of this message is still in flight; let it land first
+                await asyncio.wait([after])
+            result = await getattr(self.bot, method)(*args, **kwargs)
+        except telepot.exception.TooManyRequestsError as e:
+            # Multiplicative decrease, then retry once the wait is over
+            self._rate = max(SEND_MIN_RATE, self._rate / 2)
+            retry_after = (e.json.get('parameters') or {}).get('retry_after', 1)
+            self._resume_at = max(self._resume_at, asyncio.get_running_loop().time() + retry_after)
+            logger.warning(f"Flood limit hit, sending at {self._rate:g}/s after {retry_after}s")
+            self._requeue(seq, [method, args, kwargs, futures])
+        except Exception as e:
+            if not futures:
+                logger.error(f"Error in {method}: {str(e)}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            # Additive increase back towards the full rate
+            self._rate = min(self._max_rate, self._rate + SEND_RATE_STEP)
+            for future in futures:
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+    
+    def stop(self):
+        """Cancel the worker and any calls still in flight"""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        for task in self._calls:
+            task.cancel()
+
 class WikiBot:
-    def __init__(self, token):
+    def __init__(self, token, loop=None, session_store=None):
         self.token = token
-        self.bot = telepot.aio.Bot(token)
+        self.bot = telepot.aio.Bot(token, loop=loop)
+        self.session_store = session_store
         self._answerer = telepot.aio.helper.Answerer(self.bot)
+        self.send_queue = SendQueue(self.bot)
+        self.chat_queues = {}  # chat_id -> queue of (handler, msg) for that chat's worker
+        self.latest_callbacks = {}  # (chat_id, message_id) -> ID of the newest queued callback query
+        self._callback_answers = set()
+        self._chat_workers = set()
+        
+        # Command handlers, keyed by command (called with the chat ID)
+        self.command_handlers = {
+            '/start': self.handle_start,
+            '/help': self.handle_help,
+            '/cancel': self.handle_cancel,
+        }
+        
+        # Callback handlers, keyed by callback data prefix (called with the payload)
+        self.callback_handlers = {
+            CB_LANGUAGE: self.handle_language_selection,
+            CB_ARTICLE: self.handle_article_selection,
+            CB_ACTION: self.handle_action_selection,
+            CB_VIEW_LANG: self.handle_view_language_selection,
+            CB_TRANSLATE: self.handle_translate_selection,
+            "section": self.handle_section_navigation,
+            "trans_section": self.handle_translated_section_navigation,
+            "translate_section": self.handle_translate_section,
+            "section_translate": self.handle_section_translate,
+        }
+        
+        # Callback handlers for data without a payload, keyed by the whole data
+        self.action_callback_handlers = {
+            "new_search": self.handle_new_search,
+            "try_again": self.handle_try_again,
+            "back_to_article": self.handle_back_to_article,
+            "read_translation": self.handle_read_translation,
+            "download_translation": self.handle_download_translation,
+            "back_to_translation": self.handle_back_to_translation,
+        }
+    
+    def on_chat_message(self, msg):
+        """Queue an incoming message for its chat's worker"""
+        self.enqueue_update(msg['chat']['id'], self.handle_message, msg)
+    
+    def on_callback_query(self, msg):
+        """Queue a callback query for its chat's worker"""
+        message = msg['message']
+        query = CallbackQuery(
+            query_id=msg['id'],
+            chat_id=message['chat']['id'],
+            message_id=message['message_id'],
+            data=msg.get('data', ''),
+            # Documents and messages past the edit window can't take a text edit
+            editable='text' in message and time.time() - message['date'] < MESSAGE_EDIT_WINDOW
+        )
+        self.latest_callbacks[(query.chat_id, query.message_id)] = query.query_id
+        
+        # Acknowledge right away to stop the loading indicator, even while the
+        # chat's worker is still busy with earlier updates
+        task = asyncio.create_task(self.answer_callback_query(query.query_id))
+        self._callback_answers.add(task)
+        task.add_done_callback(self._callback_answers.discard)
+        
+        self.enqueue_update(query.chat_id, self.handle_callback_query, query)
+    
+    async def answer_callback_query(self, query_id):
+        """Acknowledge a callback query, logging instead of raising on failure"""
+        try:
+            await self.bot.answerCallbackQuery(query_id)
+        except Exception as e:
+            logger.error(f"Error answering callback query: {str(e)}")
+    
+    def enqueue_update(self, chat_id, handler, msg):
+        """Queue an update, starting a worker for the chat if it has none"""
+        queue = self.chat_queues.get(chat_id)
+        if queue is None:
+            queue = self.chat_queues[chat_id] = asyncio.Queue()
+            task = asyncio.create_task(self.chat_worker(chat_id, queue))
+            self._chat_workers.add(task)
+            task.add_done_callback(self._chat_workers.discard)
+        queue.put_nowait((handler, msg))
+    
+    async def chat_worker(self, chat_id, queue):
+        """Handle one chat's updates in the order they arrived"""
+        while True:
+            try:
+                handler, msg = await asyncio.wait_for(queue.get(), CHAT_WORKER_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    # Idle: exit, the next update starts a fresh worker
+                    del self.chat_queues[chat_id]
+                    return
+                continue
+            
+            if self.session_store is not None:
+                await self.session_store.load(chat_id)
+            session = get_user_session(chat_id)
+            
+            try:
+                await handler(msg)
+            except Exception as e:
+                logger.error(f"Error handling update for chat {chat_id}: {str(e)}")
+            
+            touch_user_session(chat_id, session)
+            if self.session_store is not None:
+                self.session_store.mark_dirty(chat_id)
+    
+    def stop_chat_workers(self):
+        """Cancel all per-chat workers"""
+        for task in self._chat_workers:
+            task.cancel()
     
     async def handle_message(self, msg):
         """Handle incoming messages"""
         content_type, chat_type, chat_id = telepot.glance(msg)
-        logger.info(f"Message from {chat_id}: {content_type}")
+        logger.info("Message from %s: %s", chat_id, content_type)
         
-        # Initialize user state if needed
-        if chat_id not in USER_STATE:
-            USER_STATE[chat_id] = "START"
-        
-        # Initialize user data if needed
-        if chat_id not in USER_DATA:
-            USER_DATA[chat_id] = {"language": DEFAULT_LANGUAGE}
+        # Initialize or refresh the user session
+        get_user_session(chat_id)
             
         # Handle different message types
         if content_type == 'text':
@@ -197,110 +1118,74 @@ class WikiBot:
             
             # Handle commands
             if text.startswith('/'):
-                command = text.split('@')[0].lower()
+                command = text.partition('@')[0].lower()
                 await self.handle_command(command, chat_id)
             else:
                 # Handle regular messages based on user state
                 await self.handle_text_message(text, chat_id)
         else:
-            await self.bot.sendMessage(
+            await self.send_queue.send_message(
                 chat_id, 
                 "I can only process text messages. Please send a text message."
             )
     
     async def handle_command(self, command, chat_id):
         """Handle bot commands"""
-        if command == '/start':
-            await self.handle_start(chat_id)
-        elif command == '/help':
-            await self.handle_help(chat_id)
-        elif command == '/cancel':
-            await self.handle_cancel(chat_id)
+        handler = self.command_handlers.get(command)
+        if handler:
+            await handler(chat_id)
         else:
-            await self.bot.sendMessage(
+            await self.send_queue.send_message(
                 chat_id,
                 "Unknown command. Try /start, /help, or /cancel."
             )
     
     async def handle_start(self, chat_id):
         """Handle /start command"""
-        # Reset user state
-        USER_STATE[chat_id] = "SELECTING_LANGUAGE"
-        
-        # Reset user data
-        USER_DATA[chat_id] = {"language": DEFAULT_LANGUAGE}
+        # Reset user session
+        SESSIONS[chat_id] = UserSession(state="SELECTING_LANGUAGE")
         
         # Show language selection keyboard
-        keyboard = []
-        row = []
-        
-        for i, (lang_code, lang_name) in enumerate(POPULAR_LANGUAGES.items()):
-            button = InlineKeyboardButton(
-                text=f"{lang_name} ({lang_code})", 
-                callback_data=f"{CB_LANGUAGE}:{lang_code}"
-            )
-            row.append(button)
-            
-            # Create rows with 2 buttons each
-            if len(row) == 2 or i == len(POPULAR_LANGUAGES) - 1:
-                keyboard.append(row)
-                row = []
+        keyboard = LANGUAGE_KEYBOARD
         
         # Send welcome message with language selection
-        await self.bot.sendMessage(
+        await self.send_queue.send_message(
             chat_id,
-            "🌍 Welcome to WikiSearch Bot!\n\n"
-            "I can help you search, read, and translate Wikipedia articles in multiple languages.\n\n"
-            "Please select a language for your search:",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+            WELCOME_TEXT,
+            reply_markup=keyboard
         )
     
     async def handle_help(self, chat_id):
         """Handle /help command"""
-        help_text = (
-            "📖 *WikiSearch Bot Help*\n\n"
-            "*Commands:*\n"
-            "/start - Start a new search\n"
-            "/help - Show this help message\n"
-            "/cancel - Cancel current operation\n\n"
-            "*How to use:*\n"
-            "1. Select a language for search\n"
-            "2. Enter your search term\n"
-            "3. Select an article from search results\n"
-            "4. Choose what you want to do with the article\n\n"
-            "You can view full articles, see them in other languages, translate them, "
-            "or download them as documents."
-        )
-        
-        await self.bot.sendMessage(
+        await self.send_queue.send_message(
             chat_id,
-            help_text,
+            HELP_TEXT,
             parse_mode="Markdown"
         )
     
     async def handle_cancel(self, chat_id):
         """Handle /cancel command"""
-        USER_STATE[chat_id] = "START"
+        get_user_session(chat_id).state = "START"
         
-        await self.bot.sendMessage(
+        await self.send_queue.send_message(
             chat_id,
             "Operation cancelled. Type /start to begin a new search."
         )
     
     async def handle_text_message(self, text, chat_id):
         """Handle non-command text messages based on user state"""
-        state = USER_STATE.get(chat_id, "START")
+        state = get_user_session(chat_id).state
         
         if state == "START":
             # If no active session, suggest starting
-            await self.bot.sendMessage(
+            await self.send_queue.send_message(
                 chat_id,
                 "Please use /start to begin searching for Wikipedia articles."
             )
         
         elif state == "SELECTING_LANGUAGE":
             # Should not reach here as this is handled by callback
-            await self.bot.sendMessage(
+            await self.send_queue.send_message(
                 chat_id,
                 "Please select a language from the options."
             )
@@ -312,20 +1197,22 @@ class WikiBot:
     async def handle_search(self, query, chat_id):
         """Process a search query"""
         # Store the query
-        USER_DATA[chat_id]['search_query'] = query
-        language = USER_DATA[chat_id].get('language', DEFAULT_LANGUAGE)
+        session = get_user_session(chat_id)
+        session.search_query = query
+        language = session.language
+        language_name = get_language_name(language)
         
         # Show searching message
-        wait_msg = await self.bot.sendMessage(
+        wait_msg = await self.send_queue.send_message(
             chat_id,
-            f"Searching for '{query}' in {get_language_name(language)}..."
+            f"Searching for '{query}' in {language_name}..."
         )
         
         # Search Wikipedia
-        search_results = search_wikipedia(query, language)
+        search_results = await search_wikipedia(query, language)
         
         # Update state
-        USER_STATE[chat_id] = "VIEWING_RESULTS"
+        session.state = "VIEWING_RESULTS"
         
         # Process search results
         if search_results:
@@ -348,38 +1235,24 @@ class WikiBot:
             ])
             
             # Show results
-            await self.bot.editMessageText(
+            await self.send_queue.edit_message_text(
                 (chat_id, wait_msg['message_id']),
-                f"Search results for '{query}' in {get_language_name(language)}:\n"
+                f"Search results for '{query}' in {language_name}:\n"
                 f"Please select an article to view:",
                 reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
             )
         else:
             # No results found
-            keyboard = [
-                [
-                    InlineKeyboardButton(
-                        text="Try Different Search", 
-                        callback_data="try_again"
-                    ), 
-                    InlineKeyboardButton(
-                        text="Change Language", 
-                        callback_data="new_search"
-                    )
-                ]
-            ]
-            
-            await self.bot.editMessageText(
+            await self.send_queue.edit_message_text(
                 (chat_id, wait_msg['message_id']),
-                f"No results found for '{query}' in {get_language_name(language)}.\n\n"
-                f"Would you like to try a different search or change the language?",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+                NO_RESULTS_TEMPLATE.format(query=query, language_name=language_name),
+                reply_markup=NO_RESULTS_KEYBOARD
             )
     
     async def display_article_section(self, chat_id, message_id, article, section_index):
         """Display a specific section of an article with navigation buttons"""
-        user_data = USER_DATA[chat_id]
-        sections = user_data.get('article_sections', [])
+        session = get_user_session(chat_id)
+        sections = session.article_sections
         
         if not sections or section_index >= len(sections) or section_index < 0:
             # Invalid section index, go back to article
@@ -411,7 +1284,7 @@ class WikiBot:
             keyboard.append(nav_row)
             
         # Translate section button
-        language = user_data.get('language', DEFAULT_LANGUAGE)
+        language = session.language
         keyboard.append([
             InlineKeyboardButton(
                 text="🔄 Translate Section", 
@@ -445,260 +1318,153 @@ class WikiBot:
         )
         
         # Make sure we don't exceed message limits
-        if len(message) > 4000:
-            message = message[:3997] + "..."
+        message = truncate_text(message, MESSAGE_LIMIT)
             
-        try:
-            # Try to edit the existing message
-            await self.bot.editMessageText(
-                (chat_id, message_id),
-                message,
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
-        except Exception as e:
-            # If there's an error (e.g., message too old), send a new message
-            logger.error(f"Error editing message: {str(e)}")
-            await self.bot.sendMessage(
-                chat_id,
-                message,
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
+        # Edit the existing message, or send a new one if it can't be edited
+        await self.send_queue.edit_or_send(
+            (chat_id, message_id),
+            message,
+            parse_mode="Markdown",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+        )
 
-    async def handle_callback_query(self, msg):
+    async def handle_callback_query(self, query):
         """Handle callback queries from inline keyboards"""
-        query_id, from_id, query_data = telepot.glance(msg, flavor='callback_query')
-        chat_id = msg['message']['chat']['id']
-        message_id = msg['message']['message_id']
-        
-        logger.info(f"Callback query from {chat_id}: {query_data}")
-        
-        # Initialize user state & data if needed
-        if chat_id not in USER_STATE:
-            USER_STATE[chat_id] = "START"
-        if chat_id not in USER_DATA:
-            USER_DATA[chat_id] = {"language": DEFAULT_LANGUAGE}
-        
-        # Always acknowledge the callback to stop loading indicator
-        await self.bot.answerCallbackQuery(query_id)
-        
-        # Handle language selection
-        if query_data.startswith(f"{CB_LANGUAGE}:"):
-            await self.handle_language_selection(chat_id, message_id, query_data)
-        
-        # Handle article selection
-        elif query_data.startswith(f"{CB_ARTICLE}:"):
-            await self.handle_article_selection(chat_id, message_id, query_data)
-        
-        # Handle action selection
-        elif query_data.startswith(f"{CB_ACTION}:"):
-            await self.handle_action_selection(chat_id, message_id, query_data)
-        
-        # Handle language view selection
-        elif query_data.startswith(f"{CB_VIEW_LANG}:"):
-            await self.handle_view_language_selection(chat_id, message_id, query_data)
+        query_id, chat_id, message_id, query_data = query.query_id, query.chat_id, query.message_id, query.data
         
-        # Handle translation language selection
-        elif query_data.startswith(f"{CB_TRANSLATE}:"):
-            await self.handle_translate_selection(chat_id, message_id, query_data)
-            
-        # Handle article section navigation
-        elif query_data.startswith("section:"):
-            section_index = int(query_data.split(":", 1)[1])
-            article = USER_DATA[chat_id].get('current_article')
-            if article:
-                await self.display_article_section(chat_id, message_id, article, section_index)
-                
-        # Handle translated section navigation
-        elif query_data.startswith("trans_section:"):
-            section_index = int(query_data.split(":", 1)[1])
-            article = USER_DATA[chat_id].get('translated_article')
-            if article:
-                await self.display_translated_section(chat_id, message_id, article, section_index)
-                
-        # Handle section translation
-        elif query_data.startswith("translate_section:"):
-            await self.handle_translate_section(chat_id, message_id, query_data)
-            
-        # Handle section translation language selection
-        elif query_data.startswith("section_translate:"):
-            await self.handle_section_translate(chat_id, message_id, query_data)
+        logger.info("Callback query from %s: %s", chat_id, query_data)
         
-        # Handle navigation actions
-        elif query_data == "new_search":
-            await self.handle_new_search(chat_id, message_id)
+        if not query.editable:
+            self.send_queue.mark_uneditable((chat_id, message_id))
         
-        elif query_data == "try_again":
-            await self.handle_try_again(chat_id, message_id)
+        # Initialize or refresh the user session
+        session = get_user_session(chat_id)
         
-        elif query_data == "back_to_article":
-            await self.handle_back_to_article(chat_id, message_id)
+        # Dispatch on the prefix of "prefix:payload" data, or on the whole data
+        prefix, sep, payload = query_data.partition(':')
         
-        elif query_data == "read_translation":
-            await self.handle_read_translation(chat_id, message_id)
+        # Coalesce rapid taps: skip a redraw that a newer queued tap will replace
+        key = (chat_id, message_id)
+        latest = self.latest_callbacks.get(key, query_id)
+        if latest == query_id:
+            self.latest_callbacks.pop(key, None)
+        elif prefix in REDRAW_CALLBACKS:
+            return
         
-        elif query_data == "download_translation":
-            await self.handle_download_translation(chat_id, message_id)
+        # After a restart, fetch the session's article once a tap needs it
+        if session.pending_articles is not None:
+            if prefix in TRANSLATION_REPLACING_CALLBACKS:
+                session.pending_articles.pop('translated', None)
+                session.pending_articles.pop('reading_translation', None)
+            if prefix == CB_ARTICLE:
+                session.pending_articles = None
+            elif prefix not in ARTICLELESS_CALLBACKS:
+                await restore_session_articles(session, prefix in TRANSLATION_CALLBACKS)
+        
+        handler = self.callback_handlers.get(prefix) if sep else None
+        if handler is not None:
+            await handler(chat_id, message_id, payload)
+            return
         
-        elif query_data == "back_to_translation":
-            await self.handle_back_to_translation(chat_id, message_id)
+        handler = self.action_callback_handlers.get(query_data)
+        if handler is not None:
+            await handler(chat_id, message_id)
     
-    async def handle_language_selection(self, chat_id, message_id, query_data):
+    async def handle_section_navigation(self, chat_id, message_id, payload):
+        """Show another section of the current article"""
+        article = get_user_session(chat_id).current_article
+        if article:
+            await self.display_article_section(chat_id, message_id, article, int(payload))
+    
+    async def handle_translated_section_navigation(self, chat_id, message_id, payload):
+        """Show another section of the current translation"""
+        article = get_user_session(chat_id).translated_article
+        if article:
+            await self.display_translated_section(chat_id, message_id, article, int(payload))
+    
+    async def handle_language_selection(self, chat_id, message_id, lang_code):
         """Process language selection"""
-        # Extract language code
-        lang_code = query_data.split(':', 1)[1]
-        
-        # Update user data with selected language
-        USER_DATA[chat_id]['language'] = lang_code
+        # Update session with selected language
+        session = get_user_session(chat_id)
+        session.language = lang_code
         
         # Update state
-        USER_STATE[chat_id] = "SEARCHING"
+        session.state = "SEARCHING"
         
         # Prompt for search term
-        await self.bot.editMessageText(
+        await self.send_queue.edit_message_text(
             (chat_id, message_id),
             f"Selected language: {get_language_name(lang_code)}\n\n"
             f"Please enter a search term to find Wikipedia articles:"
         )
     
-    async def handle_article_selection(self, chat_id, message_id, query_data):
+    async def handle_article_selection(self, chat_id, message_id, title):
         """Process article selection"""
-        # Extract article title
-        title = query_data.split(':', 1)[1]
-        
-        # Get user data
-        user_data = USER_DATA[chat_id]
-        language = user_data.get('language', DEFAULT_LANGUAGE)
+        # Get user session
+        session = get_user_session(chat_id)
+        language = session.language
         
-        # Fetch article content
-        await self.bot.editMessageText(
-            (chat_id, message_id),
-            f"Loading article '{title}'..."
-        )
+        # Fetch article content, showing a loading notice only if it isn't cached
+        if not is_article_cached(title, language):
+            self.send_queue.post_edit(
+                (chat_id, message_id),
+                f"Loading article '{title}'..."
+            )
         
-        article = get_wikipedia_article(title, language)
+        article = await get_wikipedia_article(title, language)
         
         if not article:
             # Article not found
-            keyboard = [[
-                InlineKeyboardButton(text="Try again", callback_data="try_again"),
-                InlineKeyboardButton(text="New search", callback_data="new_search")
-            ]]
-            
-            await self.bot.editMessageText(
+            await self.send_queue.edit_message_text(
                 (chat_id, message_id),
                 f"Sorry, could not retrieve the article '{title}'.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+                reply_markup=ARTICLE_NOT_FOUND_KEYBOARD
             )
             return
         
         # Store article data
-        USER_DATA[chat_id]['current_article'] = article
+        session.current_article = article
         
         # Update state
-        USER_STATE[chat_id] = "VIEWING_ARTICLE"
+        session.state = "VIEWING_ARTICLE"
         
         # Get available languages for the article
         available_languages = article.get('available_languages', {})
         
         # Create keyboard for article actions
-        keyboard = []
+        keyboard = article_actions_keyboard(available_languages)
         
-        # Read full article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Read Full Article", 
-                callback_data=f"{CB_ACTION}:read"
-            )
-        ])
+        # Summary message, formatted once when the article was fetched
+        message = article.get('summary_message') or format_article_message(article, language)
         
-        # Other language versions button (if available)
-        if available_languages and len(available_languages) > 1:
-            keyboard.append([
-                InlineKeyboardButton(
-                    text="View in Another Language", 
-                    callback_data=f"{CB_ACTION}:languages"
-                )
-            ])
+        await self.send_queue.edit_message_text(
+            (chat_id, message_id),
+            message,
+            parse_mode="Markdown",
+            reply_markup=keyboard
+        )
+    
+    async def handle_action_selection(self, chat_id, message_id, action):
+        """Process action selection for an article"""
+        # Get user session
+        session = get_user_session(chat_id)
+        article = session.current_article
         
-        # Translate article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Translate Article", 
-                callback_data=f"{CB_ACTION}:translate"
+        if not article:
+            await self.send_queue.send_message(
+                chat_id,
+                "Article data not found. Please start a new search with /start."
             )
-        ])
-        
-        # Download article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Download as Document", 
-                callback_data=f"{CB_ACTION}:download"
-            )
-        ])
-        
-        # Copy article link button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Copy Wikipedia Link", 
-                callback_data=f"{CB_ACTION}:link"
-            )
-        ])
-        
-        # New search button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="New Search", 
-                callback_data="new_search"
-            )
-        ])
-        
-        # Format message with article summary (limit to ~1000 chars)
-        summary = article['summary']
-        if len(summary) > 1000:
-            summary = summary[:997] + "..."
-        
-        message = (
-            f"📚 *{article['title']}*\n\n"
-            f"{summary}\n\n"
-            f"_Language: {get_language_name(language)}_"
-        )
-        
-        await self.bot.editMessageText(
-            (chat_id, message_id),
-            message,
-            parse_mode="Markdown",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-        )
-    
-    async def handle_action_selection(self, chat_id, message_id, query_data):
-        """Process action selection for an article"""
-        # Extract action
-        action = query_data.split(':', 1)[1]
-        
-        # Get user data
-        user_data = USER_DATA[chat_id]
-        article = user_data.get('current_article')
-        
-        if not article:
-            await self.bot.sendMessage(
-                chat_id,
-                "Article data not found. Please start a new search with /start."
-            )
-            return
+            return
         
         # Process the selected action
         if action == "read":
             # Update state
-            USER_STATE[chat_id] = "READING_ARTICLE"
-            
-            # Split content into sections
-            sections = split_content_into_sections(article['content'])
+            session.state = "READING_ARTICLE"
             
-            # Store sections in user data
-            user_data['article_sections'] = sections
-            user_data['current_section'] = 0
+            # Store the article's (pre-split) sections in the session
+            session.article_sections = article['sections']
+            session.current_section = 0
             
             # Display the first section
             await self.display_article_section(chat_id, message_id, article, 0)
@@ -708,22 +1474,17 @@ class WikiBot:
             available_languages = article.get('available_languages', {})
             
             if not available_languages:
-                await self.bot.editMessageText(
+                await self.send_queue.edit_message_text(
                     (chat_id, message_id),
-                    f"This article is only available in {get_language_name(user_data.get('language', DEFAULT_LANGUAGE))}.",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                        InlineKeyboardButton(
-                            text="Back to Article", 
-                            callback_data="back_to_article"
-                        )
-                    ]])
+                    f"This article is only available in {get_language_name(session.language)}.",
+                    reply_markup=BACK_TO_ARTICLE_KEYBOARD
                 )
                 return
             
             # Create keyboard with available languages
             keyboard = []
             for lang_code, lang_title in available_languages.items():
-                if lang_code != user_data.get('language', DEFAULT_LANGUAGE):  # Skip current language
+                if lang_code != session.language:  # Skip current language
                     keyboard.append([
                         InlineKeyboardButton(
                             text=f"{get_language_name(lang_code)} - {lang_title}", 
@@ -739,7 +1500,7 @@ class WikiBot:
                 )
             ])
             
-            await self.bot.editMessageText(
+            await self.send_queue.edit_message_text(
                 (chat_id, message_id),
                 f"'{article['title']}' is available in these languages:",
                 reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
@@ -747,708 +1508,396 @@ class WikiBot:
         
         elif action == "translate":
             # Show translation options
-            language = user_data.get('language', DEFAULT_LANGUAGE)
-            
-            # Translation languages to show
-            translation_languages = [
-                "en", "es", "fr", "de", "it", "pt", "ru", "ja", "zh", "ko", "ar"
-            ]
-            
-            # Remove current language from options
-            if language in translation_languages:
-                translation_languages.remove(language)
+            language = session.language
             
-            # Create keyboard with translation options
-            keyboard = []
-            row = []
-            
-            for i, lang_code in enumerate(translation_languages):
-                button = InlineKeyboardButton(
-                    text=get_language_name(lang_code), 
-                    callback_data=f"{CB_TRANSLATE}:{lang_code}"
-                )
-                row.append(button)
-                
-                # 2 buttons per row
-                if len(row) == 2 or i == len(translation_languages) - 1:
-                    keyboard.append(row)
-                    row = []
-            
-            # Add back button
-            keyboard.append([
-                InlineKeyboardButton(
-                    text="Back to Article", 
-                    callback_data="back_to_article"
-                )
-            ])
-            
-            await self.bot.editMessageText(
+            await self.send_queue.edit_message_text(
                 (chat_id, message_id),
                 f"Translate '{article['title']}' to:",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+                reply_markup=TRANSLATE_KEYBOARDS.get(language, TRANSLATE_KEYBOARD_ALL)
             )
         
         elif action == "download":
             # Generate and send document
-            language = user_data.get('language', DEFAULT_LANGUAGE)
+            language = session.language
             
-            await self.bot.editMessageText(
+            self.send_queue.post_edit(
                 (chat_id, message_id),
                 f"Generating document for '{article['title']}'..."
             )
             
             try:
-                doc_path = create_document_from_article(article, language)
+                document = await build_document(article, language)
                 
-                if not doc_path or not os.path.exists(doc_path):
-                    await self.bot.editMessageText(
+                if not document:
+                    await self.send_queue.edit_message_text(
                         (chat_id, message_id),
                         "Sorry, there was an error generating the document.",
-                        reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                            InlineKeyboardButton(
-                                text="Back to Article", 
-                                callback_data="back_to_article"
-                            )
-                        ]])
+                        reply_markup=BACK_TO_ARTICLE_KEYBOARD
                     )
                     return
                 
                 # Send the document
-                with open(doc_path, 'rb') as doc_file:
-                    await self.bot.sendDocument(
-                        chat_id,
-                        document=doc_file
-                    )
-                
-                # Clean up
-                os.remove(doc_path)
+                filename, data = document
+                await self.send_queue.submit(
+                    'sendDocument',
+                    chat_id,
+                    document=(filename, data)
+                )
                 
                 # Show success message
-                await self.bot.sendMessage(
+                self.send_queue.post_message(
                     chat_id,
                     "Document generated successfully.",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                        InlineKeyboardButton(
-                            text="Back to Article", 
-                            callback_data="back_to_article"
-                        )
-                    ]])
+                    reply_markup=BACK_TO_ARTICLE_KEYBOARD
                 )
                 
             except Exception as e:
                 logger.error(f"Error generating document: {str(e)}")
                 
-                await self.bot.editMessageText(
+                await self.send_queue.edit_message_text(
                     (chat_id, message_id),
                     f"Error generating document: {str(e)}",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                        InlineKeyboardButton(
-                            text="Back to Article", 
-                            callback_data="back_to_article"
-                        )
-                    ]])
+                    reply_markup=BACK_TO_ARTICLE_KEYBOARD
                 )
         
         elif action == "link":
             # Get Wikipedia link
-            language = user_data.get('language', DEFAULT_LANGUAGE)
-            article_url = get_article_sharing_link(article['title'], language)
+            language = session.language
+            article_url = article.get('share_url') or get_article_sharing_link(article['title'], language)
             
-            await self.bot.editMessageText(
+            await self.send_queue.edit_message_text(
                 (chat_id, message_id),
                 f"Wikipedia link for '{article['title']}':\n{article_url}",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Article", 
-                        callback_data="back_to_article"
-                    )
-                ]])
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
     
-    async def handle_view_language_selection(self, chat_id, message_id, query_data):
+    async def handle_view_language_selection(self, chat_id, message_id, target_lang):
         """Process viewing article in another language"""
-        # Extract target language
-        target_lang = query_data.split(':', 1)[1]
-        
-        # Get user data
-        user_data = USER_DATA[chat_id]
-        article = user_data.get('current_article')
+        # Get user session
+        session = get_user_session(chat_id)
+        article = session.current_article
         
         if not article:
-            await self.bot.sendMessage(
+            await self.send_queue.send_message(
                 chat_id,
                 "Article data not found. Please start a new search with /start."
             )
             return
         
         # Get source language
-        source_lang = user_data.get('language', DEFAULT_LANGUAGE)
+        source_lang = session.language
         
-        # Show loading message
-        await self.bot.editMessageText(
-            (chat_id, message_id),
-            f"Loading article in {get_language_name(target_lang)}..."
-        )
+        # Already showing this language: just show the article again
+        if target_lang == source_lang:
+            await self.handle_back_to_article(chat_id, message_id)
+            return
         
         # Check if language is available
         available_languages = article.get('available_languages', {})
         
         if target_lang not in available_languages:
-            await self.bot.editMessageText(
+            await self.send_queue.edit_message_text(
                 (chat_id, message_id),
                 f"This article is not available in {get_language_name(target_lang)}.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Article", 
-                        callback_data="back_to_article"
-                    )
-                ]])
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
             return
         
-        # Get article in target language
         target_title = available_languages[target_lang]
-        target_article = get_article_in_other_language(target_title, target_lang)
+        
+        # Show loading message, unless the article is already cached
+        if not is_article_cached(target_title, target_lang):
+            self.send_queue.post_edit(
+                (chat_id, message_id),
+                f"Loading article in {get_language_name(target_lang)}..."
+            )
+        
+        # Get article in target language
+        target_article = await get_article_in_other_language(
+            target_title, target_lang, available_languages
+        )
         
         if not target_article:
-            await self.bot.editMessageText(
+            await self.send_queue.edit_message_text(
                 (chat_id, message_id),
                 f"Failed to retrieve article in {get_language_name(target_lang)}.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Article", 
-                        callback_data="back_to_article"
-                    )
-                ]])
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
             return
         
-        # Update user data
-        user_data['current_article'] = target_article
-        user_data['language'] = target_lang
+        # Update user session
+        session.current_article = target_article
+        session.language = target_lang
         
         # Create keyboard for article actions
-        keyboard = []
-        
-        # Read full article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Read Full Article", 
-                callback_data=f"{CB_ACTION}:read"
-            )
-        ])
-        
-        # Other language versions button
-        if available_languages and len(available_languages) > 1:
-            keyboard.append([
-                InlineKeyboardButton(
-                    text="View in Another Language", 
-                    callback_data=f"{CB_ACTION}:languages"
-                )
-            ])
+        keyboard = article_actions_keyboard(available_languages)
         
-        # Translate article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Translate Article", 
-                callback_data=f"{CB_ACTION}:translate"
-            )
-        ])
+        # Summary message, formatted once when the article was fetched
+        message = target_article.get('summary_message') or format_article_message(target_article, target_lang)
         
-        # Download article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Download as Document", 
-                callback_data=f"{CB_ACTION}:download"
-            )
-        ])
-        
-        # Copy article link button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Copy Wikipedia Link", 
-                callback_data=f"{CB_ACTION}:link"
-            )
-        ])
-        
-        # New search button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="New Search", 
-                callback_data="new_search"
-            )
-        ])
-        
-        # Format message with article summary
-        summary = target_article['summary']
-        if len(summary) > 1000:
-            summary = summary[:997] + "..."
-            
-        message = (
-            f"📚 *{target_article['title']}*\n\n"
-            f"{summary}\n\n"
-            f"_Language: {get_language_name(target_lang)}_"
-        )
-        
-        await self.bot.editMessageText(
+        await self.send_queue.edit_message_text(
             (chat_id, message_id),
             message,
             parse_mode="Markdown",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+            reply_markup=keyboard
         )
     
-    async def handle_translate_selection(self, chat_id, message_id, query_data):
+    async def handle_translate_selection(self, chat_id, message_id, target_lang):
         """Process translating article to selected language"""
-        # Extract target language
-        target_lang = query_data.split(':', 1)[1]
-        
-        # Get user data
-        user_data = USER_DATA[chat_id]
-        article = user_data.get('current_article')
+        # Get user session
+        session = get_user_session(chat_id)
+        article = session.current_article
         
         if not article:
-            await self.bot.sendMessage(
+            await self.send_queue.send_message(
                 chat_id,
                 "Article data not found. Please start a new search with /start."
             )
             return
         
         # Get source language
-        source_lang = user_data.get('language', DEFAULT_LANGUAGE)
+        source_lang = session.language
         
         # Update state
-        USER_STATE[chat_id] = "TRANSLATING"
+        session.state = "TRANSLATING"
         
-        # Show loading message
-        await self.bot.editMessageText(
-            (chat_id, message_id),
-            f"Translating article from {get_language_name(source_lang)} to {get_language_name(target_lang)}...\n\n"
-            f"This may take a moment."
-        )
+        # Show loading message, unless the translation is already cached
+        if not is_translation_cached(article, source_lang, target_lang):
+            self.send_queue.post_edit(
+                (chat_id, message_id),
+                f"Translating article from {get_language_name(source_lang)} to {get_language_name(target_lang)}...\n\n"
+                f"This may take a moment."
+            )
         
         # Translate the article
         try:
-            translated_article = translate_article_content(article, source_lang, target_lang)
+            translated_article = await translate_article(article, source_lang, target_lang)
             
             if not translated_article:
-                await self.bot.editMessageText(
+                await self.send_queue.edit_message_text(
                     (chat_id, message_id),
                     f"Failed to translate the article to {get_language_name(target_lang)}.",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                        InlineKeyboardButton(
-                            text="Back to Article", 
-                            callback_data="back_to_article"
-                        )
-                    ]])
+                    reply_markup=BACK_TO_ARTICLE_KEYBOARD
                 )
                 return
             
             # Store the translated article
-            user_data['translated_article'] = translated_article
-            user_data['translation_language'] = target_lang
+            session.translated_article = translated_article
+            session.translation_language = target_lang
             
             # Update state
-            USER_STATE[chat_id] = "VIEWING_TRANSLATION"
-            
-            # Format message with translated summary
-            summary = translated_article['summary']
-            if len(summary) > 1000:
-                summary = summary[:997] + "..."
-                
-            # Create keyboard for translation actions
-            keyboard = [
-                [InlineKeyboardButton(
-                    text="Read Full Translation", 
-                    callback_data="read_translation"
-                )],
-                [InlineKeyboardButton(
-                    text="Download Translation", 
-                    callback_data="download_translation"
-                )],
-                [InlineKeyboardButton(
-                    text="Back to Original Article", 
-                    callback_data="back_to_article"
-                )],
-                [InlineKeyboardButton(
-                    text="New Search", 
-                    callback_data="new_search"
-                )]
-            ]
-            
-            message = (
-                f"📚 *{translated_article['title']}*\n\n"
-                f"Translated from {get_language_name(source_lang)} to {get_language_name(target_lang)}:\n\n"
-                f"{summary}\n\n"
-                f"_Note: This is a machine translation and may not be perfect._"
-            )
+            session.state = "VIEWING_TRANSLATION"
             
-            await self.bot.editMessageText(
+            await self.send_queue.edit_message_text(
                 (chat_id, message_id),
-                message,
+                format_translation_message(translated_article, source_lang, target_lang),
                 parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+                reply_markup=TRANSLATION_ACTIONS_KEYBOARD
             )
             
         except Exception as e:
             logger.error(f"Translation error: {str(e)}")
             
-            await self.bot.editMessageText(
+            await self.send_queue.edit_message_text(
                 (chat_id, message_id),
                 f"Translation error: {str(e)}",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Article", 
-                        callback_data="back_to_article"
-                    )
-                ]])
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
     
     async def handle_new_search(self, chat_id, message_id):
         """Process new search request"""
         # Update state
-        USER_STATE[chat_id] = "SELECTING_LANGUAGE"
+        get_user_session(chat_id).state = "SELECTING_LANGUAGE"
         
         # Create keyboard with language options
-        keyboard = []
-        row = []
-        
-        for i, (lang_code, lang_name) in enumerate(POPULAR_LANGUAGES.items()):
-            button = InlineKeyboardButton(
-                text=f"{lang_name} ({lang_code})", 
-                callback_data=f"{CB_LANGUAGE}:{lang_code}"
-            )
-            row.append(button)
-            
-            # Create rows with 2 buttons each
-            if len(row) == 2 or i == len(POPULAR_LANGUAGES) - 1:
-                keyboard.append(row)
-                row = []
+        keyboard = LANGUAGE_KEYBOARD
         
         # Update the message
-        try:
-            await self.bot.editMessageText(
-                (chat_id, message_id),
-                "🌍 Start a new search!\n\n"
-                "Please select a language for your search:",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
-        except telepot.exception.TelegramError:
-            # If we can't edit the message (e.g., too old), send a new one
-            await self.bot.sendMessage(
-                chat_id,
-                "🌍 Start a new search!\n\n"
-                "Please select a language for your search:",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
+        await self.send_queue.edit_or_send(
+            (chat_id, message_id),
+            NEW_SEARCH_TEXT,
+            reply_markup=keyboard
+        )
     
     async def handle_try_again(self, chat_id, message_id):
         """Process try again request"""
         # Get current language
-        language = USER_DATA[chat_id].get('language', DEFAULT_LANGUAGE)
+        session = get_user_session(chat_id)
+        language = session.language
         
         # Update state
-        USER_STATE[chat_id] = "SEARCHING"
+        session.state = "SEARCHING"
         
         # Prompt for a new search
-        try:
-            await self.bot.editMessageText(
-                (chat_id, message_id),
-                f"Please enter a new search query (language: {get_language_name(language)}):"
-            )
-        except telepot.exception.TelegramError:
-            # If we can't edit the message, send a new one
-            await self.bot.sendMessage(
-                chat_id,
-                f"Please enter a new search query (language: {get_language_name(language)}):"
-            )
+        await self.send_queue.edit_or_send(
+            (chat_id, message_id),
+            f"Please enter a new search query (language: {get_language_name(language)}):"
+        )
     
     async def handle_back_to_article(self, chat_id, message_id):
         """Process back to article request"""
-        # Get user data
-        user_data = USER_DATA[chat_id]
-        article = user_data.get('current_article')
+        # Get user session
+        session = get_user_session(chat_id)
+        article = session.current_article
         
         if not article:
-            await self.bot.sendMessage(
+            await self.send_queue.send_message(
                 chat_id,
                 "Article data not found. Please start a new search with /start."
             )
             return
         
         # Update state
-        USER_STATE[chat_id] = "VIEWING_ARTICLE"
+        session.state = "VIEWING_ARTICLE"
         
         # Get language
-        language = user_data.get('language', DEFAULT_LANGUAGE)
+        language = session.language
         
         # Create keyboard for article actions
-        keyboard = []
-        
         # Get available languages
         available_languages = article.get('available_languages', {})
         
-        # Read full article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Read Full Article", 
-                callback_data=f"{CB_ACTION}:read"
-            )
-        ])
-        
-        # Other language versions button
-        if available_languages and len(available_languages) > 1:
-            keyboard.append([
-                InlineKeyboardButton(
-                    text="View in Another Language", 
-                    callback_data=f"{CB_ACTION}:languages"
-                )
-            ])
-        
-        # Translate article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Translate Article", 
-                callback_data=f"{CB_ACTION}:translate"
-            )
-        ])
+        keyboard = article_actions_keyboard(available_languages)
         
-        # Download article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Download as Document", 
-                callback_data=f"{CB_ACTION}:download"
-            )
-        ])
+        # Summary message, formatted once when the article was fetched
+        message = article.get('summary_message') or format_article_message(article, language)
         
-        # Copy article link button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Copy Wikipedia Link", 
-                callback_data=f"{CB_ACTION}:link"
-            )
-        ])
-        
-        # New search button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="New Search", 
-                callback_data="new_search"
-            )
-        ])
-        
-        # Format message with article summary
-        summary = article['summary']
-        if len(summary) > 1000:
-            summary = summary[:997] + "..."
-            
-        message = (
-            f"📚 *{article['title']}*\n\n"
-            f"{summary}\n\n"
-            f"_Language: {get_language_name(language)}_"
+        await self.send_queue.edit_or_send(
+            (chat_id, message_id),
+            message,
+            parse_mode="Markdown",
+            reply_markup=keyboard
         )
-        
-        try:
-            await self.bot.editMessageText(
-                (chat_id, message_id),
-                message,
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
-        except telepot.exception.TelegramError:
-            # If we can't edit the message, send a new one
-            await self.bot.sendMessage(
-                chat_id,
-                message,
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
     
     async def handle_read_translation(self, chat_id, message_id):
         """Process read translation request"""
-        # Get user data
-        user_data = USER_DATA[chat_id]
-        translated_article = user_data.get('translated_article')
+        # Get user session
+        session = get_user_session(chat_id)
+        translated_article = session.translated_article
         
         if not translated_article:
-            await self.bot.sendMessage(
+            await self.send_queue.send_message(
                 chat_id,
                 "Translation not found. Please translate the article again.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Article", 
-                        callback_data="back_to_article"
-                    )
-                ]])
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
             return
         
         # Update state
-        USER_STATE[chat_id] = "READING_TRANSLATION"
+        session.state = "READING_TRANSLATION"
         
         # Split content into sections for better navigation
         sections = split_content_into_sections(translated_article['content'])
         
-        # Store sections in user data
-        user_data['translated_sections'] = sections
-        user_data['current_translated_section'] = 0
+        # Store sections in the session
+        session.translated_sections = sections
+        session.current_translated_section = 0
         
         # Display the first section
         await self.display_translated_section(chat_id, message_id, translated_article, 0)
     
     async def handle_download_translation(self, chat_id, message_id):
         """Process download translation request"""
-        # Get user data
-        user_data = USER_DATA[chat_id]
-        translated_article = user_data.get('translated_article')
+        # Get user session
+        session = get_user_session(chat_id)
+        translated_article = session.translated_article
         
         if not translated_article:
-            await self.bot.editMessageText(
+            await self.send_queue.edit_message_text(
                 (chat_id, message_id),
                 "Translation not found. Please translate the article again.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Article", 
-                        callback_data="back_to_article"
-                    )
-                ]])
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
             return
         
         # Get language info
-        target_lang = user_data.get('translation_language', "en")
+        target_lang = session.translation_language
         
         # Show loading message
-        await self.bot.editMessageText(
+        self.send_queue.post_edit(
             (chat_id, message_id),
             f"Generating document for translated article..."
         )
         
         try:
             # Create document
-            doc_path = create_document_from_article(translated_article, target_lang)
+            document = await build_document(translated_article, target_lang)
             
-            if not doc_path or not os.path.exists(doc_path):
-                await self.bot.editMessageText(
+            if not document:
+                await self.send_queue.edit_message_text(
                     (chat_id, message_id),
                     "Sorry, there was an error generating the document.",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                        InlineKeyboardButton(
-                            text="Back to Translation", 
-                            callback_data="back_to_translation"
-                        )
-                    ]])
+                    reply_markup=BACK_TO_TRANSLATION_KEYBOARD
                 )
                 return
             
             # Send the document
-            with open(doc_path, 'rb') as doc_file:
-                await self.bot.sendDocument(
-                    chat_id,
-                    document=doc_file
-                )
-            
-            # Clean up
-            os.remove(doc_path)
+            filename, data = document
+            await self.send_queue.submit(
+                'sendDocument',
+                chat_id,
+                document=(filename, data)
+            )
             
             # Show success message
-            await self.bot.sendMessage(
+            self.send_queue.post_message(
                 chat_id,
                 "Translation document generated successfully.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Translation", 
-                        callback_data="back_to_translation"
-                    )
-                ]])
+                reply_markup=BACK_TO_TRANSLATION_KEYBOARD
             )
             
         except Exception as e:
             logger.error(f"Error generating document: {str(e)}")
             
-            await self.bot.editMessageText(
+            await self.send_queue.edit_message_text(
                 (chat_id, message_id),
                 f"Error generating document: {str(e)}",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Translation", 
-                        callback_data="back_to_translation"
-                    )
-                ]])
+                reply_markup=BACK_TO_TRANSLATION_KEYBOARD
             )
     
-    async def handle_translate_section(self, chat_id, message_id, query_data):
+    async def handle_translate_section(self, chat_id, message_id, payload):
         """Handle translating a specific section of an article"""
         # Extract section index
-        section_index = int(query_data.split(':', 1)[1])
+        section_index = int(payload)
         
-        # Get user data
-        user_data = USER_DATA[chat_id]
-        article = user_data.get('current_article')
-        sections = user_data.get('article_sections', [])
+        # Get user session
+        session = get_user_session(chat_id)
+        article = session.current_article
+        sections = session.article_sections
         
         if not article or not sections or section_index >= len(sections):
-            await self.bot.sendMessage(
+            await self.send_queue.send_message(
                 chat_id,
                 "Section data not found. Please start a new search with /start."
             )
             return
         
         # Get source language
-        source_lang = user_data.get('language', DEFAULT_LANGUAGE)
-        
-        # Show translation language options
-        keyboard = []
-        translation_languages = [
-            "en", "es", "fr", "de", "it", "pt", "ru", "ja", "zh", "ko", "ar"
-        ]
-        
-        # Remove current language from options
-        if source_lang in translation_languages:
-            translation_languages.remove(source_lang)
-        
-        # Create keyboard with translation options
-        row = []
-        for i, lang_code in enumerate(translation_languages):
-            button = InlineKeyboardButton(
-                text=get_language_name(lang_code), 
-                callback_data=f"section_translate:{section_index}:{lang_code}"
-            )
-            row.append(button)
-            
-            # 2 buttons per row
-            if len(row) == 2 or i == len(translation_languages) - 1:
-                keyboard.append(row)
-                row = []
+        source_lang = session.language
         
-        # Add back button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Back to Section", 
-                callback_data=f"section:{section_index}"
-            )
-        ])
+        # Show translation language options (skipping the current language)
+        keyboard = section_translate_keyboard(section_index, source_lang)
         
-        await self.bot.editMessageText(
+        await self.send_queue.edit_message_text(
             (chat_id, message_id),
             f"Translate this section to:",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+            reply_markup=keyboard
         )
         
-    async def handle_section_translate(self, chat_id, message_id, query_data):
+    async def handle_section_translate(self, chat_id, message_id, payload):
         """Process section translation to the selected language"""
-        # Extract data from callback query
-        parts = query_data.split(':')
-        section_index = int(parts[1])
-        target_lang = parts[2]
+        # Extract data from callback payload ("section_index:lang_code")
+        section_index, _, target_lang = payload.partition(':')
+        section_index = int(section_index)
         
-        # Get user data
-        user_data = USER_DATA[chat_id]
-        article = user_data.get('current_article')
-        sections = user_data.get('article_sections', [])
-        source_lang = user_data.get('language', DEFAULT_LANGUAGE)
+        # Get user session
+        session = get_user_session(chat_id)
+        article = session.current_article
+        sections = session.article_sections
+        source_lang = session.language
         
         if not article or not sections or section_index >= len(sections):
-            await self.bot.sendMessage(
+            await self.send_queue.send_message(
                 chat_id,
                 "Section data not found. Please start a new search with /start."
             )
@@ -1458,36 +1907,25 @@ class WikiBot:
         section = sections[section_index]
         
         # Show loading message
-        await self.bot.editMessageText(
+        self.send_queue.post_edit(
             (chat_id, message_id),
             f"Translating section from {get_language_name(source_lang)} to {get_language_name(target_lang)}..."
         )
         
         try:
-            # Translate section title if it exists
-            title = section['title']
+            # Section title if it exists; the first section falls back to the article title
+            title = section['title'] or (article['title'] if section_index == 0 else "")
+            
+            # Translate title and content in one batched call, in a worker thread
             if title:
-                translated_title = translate_text(title, target_lang, source_lang)
+                translated_title, translated_content = await asyncio.to_thread(
+                    translate_texts, [title, section['content']], target_lang, source_lang
+                )
             else:
-                if section_index == 0:
-                    translated_title = translate_text(article['title'], target_lang, source_lang)
-                else:
-                    translated_title = ""
-            
-            # Translate section content
-            translated_content = translate_text(section['content'], target_lang, source_lang)
-            
-            # Create keyboard with back buttons
-            keyboard = [
-                [InlineKeyboardButton(
-                    text="Back to Original Section", 
-                    callback_data=f"section:{section_index}"
-                )],
-                [InlineKeyboardButton(
-                    text="Back to Article", 
-                    callback_data="back_to_article"
-                )]
-            ]
+                translated_title = ""
+                translated_content = await asyncio.to_thread(
+                    translate_text, section['content'], target_lang, source_lang
+                )
             
             # Format the translated section
             if translated_title:
@@ -1496,39 +1934,33 @@ class WikiBot:
                 message = f"{translated_content}\n\n"
                 
             message += (
-                f"_Translated from {get_language_name(source_lang)} to {get_language_name(target_lang)}_\n"
+                f"_{translation_label(source_lang, target_lang)}_\n"
                 f"_Section {section_index + 1} of {len(sections)}_"
             )
             
             # Make sure we don't exceed message limits
-            if len(message) > 4000:
-                message = message[:3997] + "..."
+            message = truncate_text(message, MESSAGE_LIMIT)
                 
-            await self.bot.editMessageText(
+            await self.send_queue.edit_message_text(
                 (chat_id, message_id),
                 message,
                 parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+                reply_markup=translated_section_keyboard(section_index)
             )
             
         except Exception as e:
             logger.error(f"Section translation error: {str(e)}")
             
-            await self.bot.editMessageText(
+            await self.send_queue.edit_message_text(
                 (chat_id, message_id),
                 f"Translation error: {str(e)}",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Section", 
-                        callback_data=f"section:{section_index}"
-                    )
-                ]])
+                reply_markup=section_back_keyboard(section_index)
             )
             
     async def display_translated_section(self, chat_id, message_id, article, section_index):
         """Display a specific section of a translated article with navigation buttons"""
-        user_data = USER_DATA[chat_id]
-        sections = user_data.get('translated_sections', [])
+        session = get_user_session(chat_id)
+        sections = session.translated_sections
         
         if not sections or section_index >= len(sections) or section_index < 0:
             # Invalid section index, go back to translation
@@ -1538,34 +1970,8 @@ class WikiBot:
         # Get the current section
         section = sections[section_index]
         
-        # Create section navigation buttons
-        keyboard = []
-        nav_row = []
-        
-        # Previous section button (if not first section)
-        if section_index > 0:
-            nav_row.append(InlineKeyboardButton(
-                text="◀️ Previous", 
-                callback_data=f"trans_section:{section_index-1}"
-            ))
-        
-        # Next section button (if not last section)
-        if section_index < len(sections) - 1:
-            nav_row.append(InlineKeyboardButton(
-                text="Next ▶️", 
-                callback_data=f"trans_section:{section_index+1}"
-            ))
-            
-        if nav_row:
-            keyboard.append(nav_row)
-            
-        # Back button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Back to Translation", 
-                callback_data="back_to_translation"
-            )
-        ])
+        # Section navigation buttons
+        keyboard = translated_section_nav_keyboard(section_index, len(sections))
         
         # Format section content
         if section['title']:
@@ -1579,138 +1985,105 @@ class WikiBot:
         section_content = section['content']
                 
         # Format the entire message
-        source_lang = user_data.get('language', DEFAULT_LANGUAGE)
-        target_lang = user_data.get('translation_language', 'en')
+        source_lang = session.language
+        target_lang = session.translation_language
         
         message = (
             f"{section_title}{section_content}\n\n"
-            f"_Translated from {get_language_name(source_lang)} to {get_language_name(target_lang)}_\n"
+            f"_{translation_label(source_lang, target_lang)}_\n"
             f"_Section {section_index + 1} of {len(sections)}_"
         )
         
         # Make sure we don't exceed message limits
-        if len(message) > 4000:
-            message = message[:3997] + "..."
+        message = truncate_text(message, MESSAGE_LIMIT)
             
-        try:
-            # Try to edit the existing message
-            await self.bot.editMessageText(
-                (chat_id, message_id),
-                message,
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
-        except Exception as e:
-            # If there's an error (e.g., message too old), send a new message
-            logger.error(f"Error editing message: {str(e)}")
-            await self.bot.sendMessage(
-                chat_id,
-                message,
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
+        # Edit the existing message, or send a new one if it can't be edited
+        await self.send_queue.edit_or_send(
+            (chat_id, message_id),
+            message,
+            parse_mode="Markdown",
+            reply_markup=keyboard
+        )
             
     async def handle_back_to_translation(self, chat_id, message_id):
         """Process back to translation request"""
-        # Get user data
-        user_data = USER_DATA[chat_id]
-        translated_article = user_data.get('translated_article')
+        # Get user session
+        session = get_user_session(chat_id)
+        translated_article = session.translated_article
         
         if not translated_article:
-            await self.bot.sendMessage(
+            await self.send_queue.send_message(
                 chat_id,
                 "Translation not found. Please translate the article again.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Article", 
-                        callback_data="back_to_article"
-                    )
-                ]])
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
             return
         
         # Update state
-        USER_STATE[chat_id] = "VIEWING_TRANSLATION"
+        session.state = "VIEWING_TRANSLATION"
         
         # Get language info
-        source_lang = user_data.get('language', DEFAULT_LANGUAGE)
-        target_lang = user_data.get('translation_language', "en")
-        
-        # Format message with translated summary
-        summary = translated_article['summary']
-        if len(summary) > 1000:
-            summary = summary[:997] + "..."
-            
-        # Create keyboard for translation actions
-        keyboard = [
-            [InlineKeyboardButton(
-                text="Read Full Translation", 
-                callback_data="read_translation"
-            )],
-            [InlineKeyboardButton(
-                text="Download Translation", 
-                callback_data="download_translation"
-            )],
-            [InlineKeyboardButton(
-                text="Back to Original Article", 
-                callback_data="back_to_article"
-            )],
-            [InlineKeyboardButton(
-                text="New Search", 
-                callback_data="new_search"
-            )]
-        ]
+        source_lang = session.language
+        target_lang = session.translation_language
         
-        message = (
-            f"📚 *{translated_article['title']}*\n\n"
-            f"Translated from {get_language_name(source_lang)} to {get_language_name(target_lang)}:\n\n"
-            f"{summary}\n\n"
-            f"_Note: This is a machine translation and may not be perfect._"
+        await self.send_queue.edit_or_send(
+            (chat_id, message_id),
+            format_translation_message(translated_article, source_lang, target_lang),
+            parse_mode="Markdown",
+            reply_markup=TRANSLATION_ACTIONS_KEYBOARD
         )
-        
-        try:
-            await self.bot.editMessageText(
-                (chat_id, message_id),
-                message,
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
-        except telepot.exception.TelegramError:
-            # If we can't edit the message, send a new one
-            await self.bot.sendMessage(
-                chat_id,
-                message,
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
 
-def main():
-    """Start the WikiSearch Telegram bot"""
-    if not TELEGRAM_BOT_TOKEN:
-        logger.error("No bot token provided. Set the TELEGRAM_BOT_TOKEN environment variable.")
-        exit(1)
-    
+async def run_bot():
+    """Run the bot and its background tasks until cancelled"""
     # Create bot instance
-    bot = WikiBot(TELEGRAM_BOT_TOKEN)
+    await configure_telegram_pool()
+    session_store = SessionStore()
+    await session_store.open()
+    bot = WikiBot(TELEGRAM_BOT_TOKEN, loop=asyncio.get_running_loop(), session_store=session_store)
     
-    # Set up message handlers
-    loop = asyncio.get_event_loop()
+    # Keep references to background tasks so they aren't garbage collected
+    background_tasks = set()
     
-    # Handle incoming messages
-    loop.create_task(MessageLoop(
+    # Handle incoming messages (schedules the update polling task). Updates
+    # are queued per chat, so chats run concurrently but each stays in order.
+    message_loop = MessageLoop(
         bot.bot, 
-        {'chat': bot.handle_message, 'callback_query': bot.handle_callback_query}
-    ).run_forever())
+        {'chat': bot.on_chat_message, 'callback_query': bot.on_callback_query}
+    )
+    await message_loop.run_forever()
+    
+    # Keep the host awake without tying up a thread
+    if KEEP_ALIVE_URL:
+        task = asyncio.create_task(keep_alive())
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
     
     logger.info("WikiSearch Telegram Bot is running...")
     
     # Keep the program running
     try:
-        loop.run_forever()
-    except KeyboardInterrupt:
-        logger.info("Bot stopped by user")
+        await asyncio.Event().wait()
     finally:
-        loop.close()
+        message_loop.cancel()
+        bot.stop_chat_workers()
+        bot.send_queue.stop()
+        for task in background_tasks:
+            task.cancel()
+        await session_store.close()
+
+def main():
+    """Start the WikiSearch Telegram bot"""
+    if not TELEGRAM_BOT_TOKEN:
+        logger.error("No bot token provided. Set the TELEGRAM_BOT_TOKEN environment variable.")
+        exit(1)
+    
+    # telepot.aio binds its HTTP connection pool to the loop that was current
+    # when it was imported, so run on that loop instead of a new one
+    with asyncio.Runner(loop_factory=lambda: telepot.aio.api._loop) as runner:
+        try:
+            runner.run(run_bot())
+        except KeyboardInterrupt:
+            logger.info("Bot stopped by user")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
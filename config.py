@@ -1,5 +1,8 @@
 import os
 import logging
+from types import MappingProxyType
+
+from cachetools import TTLCache
 
 # Setup logging
 logging.basicConfig(
@@ -20,8 +23,8 @@ if not TELEGRAM_BOT_TOKEN:
     except ImportError:
         logger.warning("python-dotenv not installed, could not load .env file")
 
-# Language name mapping (from utils.py)
-LANGUAGE_NAMES = {
+# Language name mapping (from utils.py), read-only so no handler can change it
+LANGUAGE_NAMES = MappingProxyType({
     'en': 'English',
     'es': 'Spanish',
     'fr': 'French',
@@ -36,10 +39,10 @@ LANGUAGE_NAMES = {
     'ko': 'Korean',
     'tr': 'Turkish',
     # Add more languages as needed
-}
+})
 
 # Quick access language selection for search
-POPULAR_LANGUAGES = {
+POPULAR_LANGUAGES = MappingProxyType({
     'en': 'English',
     'es': 'Spanish',
     'fr': 'French', 
@@ -48,7 +51,7 @@ POPULAR_LANGUAGES = {
     'zh': 'Chinese',
     'ar': 'Arabic',
     'ja': 'Japanese'
-}
+})
 
 # Default language if none selected
 DEFAULT_LANGUAGE = 'en'
@@ -69,5 +72,14 @@ CB_ACTION = "action"
 CB_VIEW_LANG = "view_lang"
 CB_TRANSLATE = "translate"
 
-# Global cache for storing user data between callbacks
-user_data_cache = {}
+# Callback data for the article action menu
+CB_ACTION_READ = f"{CB_ACTION}:read"
+CB_ACTION_LANGUAGES = f"{CB_ACTION}:languages"
+CB_ACTION_TRANSLATE = f"{CB_ACTION}:translate"
+CB_ACTION_DOWNLOAD = f"{CB_ACTION}:download"
+CB_ACTION_LINK = f"{CB_ACTION}:link"
+
+# Global cache for storing user data between callbacks (bounded, entries expire)
+USER_DATA_MAX_CHATS = 10_000
+USER_DATA_TTL = 24 * 3600  # Seconds
+user_data_cache = TTLCache(maxsize=USER_DATA_MAX_CHATS, ttl=USER_DATA_TTL)
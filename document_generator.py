@@ -2,83 +2,218 @@
 Module for generating document files from Wikipedia articles
 """
 
+import io
 import os
 import re
-import tempfile
+import asyncio
 import logging
-from docx import Document
-from docx.shared import Pt, Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
 from wiki_utils import split_content_into_sections
 
-def create_document_from_article(article, language):
+# python-docx's default template cut down to the styles build_document uses
+# (Normal, Title, Heading 1-2), without its 430 KB of unused style definitions
+DOCX_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'minimal.docx')
+
+@lru_cache(maxsize=1)
+def docx_template():
+    """Read the document template once instead of from disk for every document"""
+    with open(DOCX_TEMPLATE_PATH, 'rb') as template_file:
+        return template_file.read()
+
+# Documents are rare and take milliseconds to build, so a couple of workers is plenty
+DOC_WORKERS = 2
+
+@lru_cache(maxsize=1)
+def doc_executor():
+    """
+    Get the process pool documents are built in, creating it on first use
+    
+    Building a document is CPU-bound Python that holds the GIL, so it runs in
+    worker processes. They are started by a fork server rather than forked
+    from the bot, whose threads may hold locks (logging, requests) that a
+    forked child would inherit locked. The fork server preloads only this
+    module; the entry script must keep its bot import under its __main__
+    guard, since workers import it again as __mp_main__.
+    """
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["document_generator"])
+    return ProcessPoolExecutor(max_workers=DOC_WORKERS, mp_context=context)
+
+# Characters that aren't allowed in file names on common filesystems
+UNSAFE_FILENAME_RE = re.compile(r'[\\/:*?"<>|]+')
+
+# A paragraph is a run of text with no blank line ('\n\n') inside it
+PARAGRAPH_RE = re.compile(r'(?:[^\n]|\n(?!\n))+')
+
+def iter_paragraphs(content):
+    """Yield the non-empty, stripped paragraphs of a text one at a time"""
+    for match in PARAGRAPH_RE.finditer(content):
+        para_text = match.group().strip()
+        if para_text:
+            yield para_text
+
+def safe_filename(title):
+    """Turn an article title into a document file name (without extension)"""
+    return UNSAFE_FILENAME_RE.sub('_', title).strip() or "article"
+
+# WordprocessingML tags for paragraphs built straight into the body XML
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_P, W_R, W_T, W_BR, W_TAB = W_NS + 'p', W_NS + 'r', W_NS + 't', W_NS + 'br', W_NS + 'tab'
+W_PPR, W_PSTYLE, W_VAL = W_NS + 'pPr', W_NS + 'pStyle', W_NS + 'val'
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+
+def make_paragraph(body, text, style_id=None):
+    """
+    Build a plain-text paragraph element for the document body
+    
+    Produces the same <w:p><w:r><w:t> markup as doc.add_paragraph(text, style),
+    including line breaks and tabs, without building Paragraph/Run objects
+    or walking the text one character at a time.
+    
+    Args:
+        body: The document's <w:body> element
+        text (str): Paragraph text
+        style_id (str): Paragraph style ID, or None for the default style
+        
+    Returns:
+        The new <w:p> element, not yet attached to the body
     """
-    Create a Word document from a Wikipedia article
+    from lxml import etree
+    
+    p = body.makeelement(W_P)
+    if style_id:
+        etree.SubElement(etree.SubElement(p, W_PPR), W_PSTYLE).set(W_VAL, style_id)
+    r = etree.SubElement(p, W_R)
+    
+    for i, line in enumerate(text.split('\n')):
+        if i:
+            etree.SubElement(r, W_BR)
+        for j, piece in enumerate(line.split('\t')):
+            if j:
+                etree.SubElement(r, W_TAB)
+            if piece:
+                t = etree.SubElement(r, W_T)
+                t.text = piece
+                if piece[0].isspace() or piece[-1].isspace():
+                    t.set(XML_SPACE, 'preserve')
+    
+    return p
+
+def append_elements(doc, elements):
+    """Add body elements in one batch, keeping the section properties last"""
+    body = doc.element.body
+    sect_pr = body.sectPr
+    if sect_pr is not None:
+        body.remove(sect_pr)
+    body.extend(elements)
+    if sect_pr is not None:
+        body.append(sect_pr)
+
+def build_document(article, language):
+    """
+    Build a Word document object from a Wikipedia article
     
     Args:
         article (dict): Article content dictionary
         language (str): Language code
         
     Returns:
-        str: Path to the generated document file
+        Document: The generated document
+    """
+    # python-docx (and lxml with it) is imported on the first document rather
+    # than at startup, since most users never download one
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    
+    article_title = article['title']
+    
+    # Create a new document from the cached template
+    doc = Document(io.BytesIO(docx_template()))
+    
+    # Set document properties
+    doc.core_properties.title = article_title
+    doc.core_properties.language = language
+    
+    # Add title
+    title = doc.add_heading(article_title, 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    # Add source information
+    source_para = doc.add_paragraph()
+    source_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    source_para.add_run(f"Source: {article['url']}").italic = True
+    
+    # Add summary section
+    doc.add_heading('Summary', 1)
+    doc.add_paragraph(article['summary'])
+    
+    # Add a page break before the full content
+    doc.add_page_break()
+    
+    # Split content into sections for better formatting
+    sections = split_content_into_sections(article['content'])
+    
+    # Heading styles used by add_heading: level 0 is the title style
+    heading_styles = {
+        level: doc.styles['Title' if level == 0 else f'Heading {level}'].style_id
+        for level in range(3)
+    }
+    
+    # Build every section's heading and paragraphs, then add them in one batch
+    body = doc.element.body
+    elements = []
+    for section in sections:
+        section_title, section_level = section['title'], section['level']
+        if section_title:
+            # Calculate heading level (1-3)
+            level = min(section_level - 1, 2) if section_level > 0 else 1
+            elements.append(make_paragraph(body, section_title, heading_styles[level]))
+        
+        # Add section content, paragraph by paragraph as they are found
+        elements.extend(make_paragraph(body, para_text) for para_text in iter_paragraphs(section['content']))
+    
+    append_elements(doc, elements)
+    
+    return doc
+
+def create_document_bytes(article, language):
+    """
+    Create a Word document from a Wikipedia article in memory
+    
+    Args:
+        article (dict): Article content dictionary
+        language (str): Language code
+        
+    Returns:
+        bytes: The generated .docx file contents
     """
     if not article:
         return None
     
     try:
-        # Create a new document
-        doc = Document()
-        
-        # Set document properties
-        doc.core_properties.title = article['title']
-        doc.core_properties.language = language
-        
-        # Add title
-        title = doc.add_heading(article['title'], 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        # Add source information
-        source_para = doc.add_paragraph()
-        source_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        source_para.add_run(f"Source: {article['url']}").italic = True
-        
-        # Add summary section
-        doc.add_heading('Summary', 1)
-        doc.add_paragraph(article['summary'])
-        
-        # Add a page break before the full content
-        doc.add_page_break()
-        
-        # Split content into sections for better formatting
-        sections = split_content_into_sections(article['content'])
-        
-        # Process each section
-        for section in sections:
-            if section['title']:
-                # Calculate heading level (1-3)
-                level = min(section['level'] - 1, 2) if section['level'] > 0 else 1
-                doc.add_heading(section['title'], level)
-            
-            # Add section content
-            content = section['content']
-            
-            # Split into paragraphs
-            paragraphs = content.split('\n\n')
-            for para_text in paragraphs:
-                if para_text.strip():
-                    doc.add_paragraph(para_text.strip())
-        
-        # Generate a temporary file for the document
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.docx')
-        doc_path = temp_file.name
-        temp_file.close()
-        
-        # Save the document
-        doc.save(doc_path)
-        
-        return doc_path
+        buffer = io.BytesIO()
+        build_document(article, language).save(buffer)
+        return buffer.getvalue()
         
     except Exception as e:
         logging.error(f"Error generating document: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+async def create_document_bytes_async(article, language):
+    """
+    Create a Word document in a worker process without blocking the event loop
+    
+    The article is pickled to the worker and the file contents come back as bytes.
+    
+    Args:
+        article (dict): Article content dictionary
+        language (str): Language code
+        
+    Returns:
+        bytes: The generated .docx file contents
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(doc_executor(), create_document_bytes, article, language)
\ No newline at end of file
@@ -2,11 +2,14 @@
 Handlers for Telegram bot commands and callbacks
 """
 
-import os
+import io
 import re
 import json
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
+import orjson
 import telepot
 from telepot.aio.delegate import per_chat_id
 from telepot.namedtuple import InlineKeyboardMarkup, InlineKeyboardButton
@@ -27,6 +30,11 @@ from config import (
     CB_ACTION,
     CB_VIEW_LANG,
     CB_TRANSLATE,
+    CB_ACTION_READ,
+    CB_ACTION_LANGUAGES,
+    CB_ACTION_TRANSLATE,
+    CB_ACTION_DOWNLOAD,
+    CB_ACTION_LINK,
     user_data_cache,
     logger
 )
@@ -40,15 +48,291 @@ from wiki_article import (
     get_article_sharing_link
 )
 
-from document_generator import create_document_from_article
+from document_generator import create_document_bytes_async, safe_filename
+
+SUMMARY_LIMIT = 1000  # Characters of an article summary shown in a message
+MESSAGE_LIMIT = 4096  # Telegram's maximum message length
+
+# Single-character ellipsis, so a cut keeps two more characters of the text
+ELLIPSIS = "…"
+
+def truncate_text(text, limit):
+    """Shorten text to at most limit characters, ending with an ellipsis when cut"""
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1] + ELLIPSIS
+
+def build_button_grid(buttons, per_row=2):
+    """Arrange buttons into keyboard rows of per_row buttons each"""
+    return [buttons[i:i + per_row] for i in range(0, len(buttons), per_row)]
+
+def _jsonable(value):
+    """Convert telepot namedtuples to plain lists and dicts, dropping unset fields"""
+    if isinstance(value, list):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, tuple) and hasattr(value, '_asdict'):
+        return {key: _jsonable(item) for key, item in value._asdict().items() if item is not None}
+    return value
+
+def serialize_markup(markup):
+    """
+    Serialize reply markup to a JSON string once.
+    
+    telepot passes string parameters through untouched, so a pre-serialized
+    keyboard skips its per-request make_jsonable and json.dumps steps.
+    """
+    return orjson.dumps(_jsonable(markup)).decode()
+
+# Keyboards that never change, built and serialized once at import
+def _build_article_actions_keyboard(has_other_languages):
+    """Build the article action menu"""
+    keyboard = [[InlineKeyboardButton(text="Read Full Article", callback_data=CB_ACTION_READ)]]
+    if has_other_languages:
+        keyboard.append([InlineKeyboardButton(text="View in Another Language", callback_data=CB_ACTION_LANGUAGES)])
+    keyboard += [
+        [InlineKeyboardButton(text="Translate Article", callback_data=CB_ACTION_TRANSLATE)],
+        [InlineKeyboardButton(text="Download as Document", callback_data=CB_ACTION_DOWNLOAD)],
+        [InlineKeyboardButton(text="Copy Wikipedia Link", callback_data=CB_ACTION_LINK)],
+        [InlineKeyboardButton(text="New Search", callback_data="new_search")]
+    ]
+    return serialize_markup(InlineKeyboardMarkup(inline_keyboard=keyboard))
+
+LANGUAGE_KEYBOARD = serialize_markup(InlineKeyboardMarkup(inline_keyboard=build_button_grid([
+    InlineKeyboardButton(text=f"{lang_name} ({lang_code})", callback_data=f"{CB_LANGUAGE}:{lang_code}")
+    for lang_code, lang_name in POPULAR_LANGUAGES.items()
+])))
+
+ARTICLE_ACTIONS_KEYBOARD = _build_article_actions_keyboard(True)
+ARTICLE_ACTIONS_KEYBOARD_NO_LANGUAGES = _build_article_actions_keyboard(False)
+
+TRANSLATION_ACTIONS_KEYBOARD = serialize_markup(InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="Read Full Translation", callback_data="read_translation")],
+    [InlineKeyboardButton(text="Download Translation", callback_data="download_translation")],
+    [InlineKeyboardButton(text="Back to Original Article", callback_data="back_to_article")],
+    [InlineKeyboardButton(text="New Search", callback_data="new_search")]
+]))
+
+BACK_TO_ARTICLE_KEYBOARD = serialize_markup(InlineKeyboardMarkup(inline_keyboard=[[
+    InlineKeyboardButton(text="Back to Article", callback_data="back_to_article")
+]]))
+
+BACK_TO_TRANSLATION_KEYBOARD = serialize_markup(InlineKeyboardMarkup(inline_keyboard=[[
+    InlineKeyboardButton(text="Back to Translation", callback_data="back_to_translation")
+]]))
+
+NO_RESULTS_KEYBOARD = serialize_markup(InlineKeyboardMarkup(inline_keyboard=[[
+    InlineKeyboardButton(text="Try Different Search", callback_data="try_again"),
+    InlineKeyboardButton(text="Change Language", callback_data="new_search")
+]]))
+
+ARTICLE_NOT_FOUND_KEYBOARD = serialize_markup(InlineKeyboardMarkup(inline_keyboard=[[
+    InlineKeyboardButton(text="Try again", callback_data="try_again"),
+    InlineKeyboardButton(text="New search", callback_data="new_search")
+]]))
+
+# Languages offered as translation targets
+TRANSLATION_LANGUAGES = ("en", "es", "fr", "de", "it", "pt", "ru", "ja", "zh", "ko", "ar")
+
+def _build_translate_keyboard(source_lang):
+    """Build the translation target grid, leaving out the source language"""
+    buttons = [
+        InlineKeyboardButton(text=get_language_name(lang_code), callback_data=f"{CB_TRANSLATE}:{lang_code}")
+        for lang_code in TRANSLATION_LANGUAGES if lang_code != source_lang
+    ]
+    keyboard = build_button_grid(buttons)
+    keyboard.append([InlineKeyboardButton(text="Back to Article", callback_data="back_to_article")])
+    return serialize_markup(InlineKeyboardMarkup(inline_keyboard=keyboard))
+
+# Keyed by the article's language; other languages get the full grid
+TRANSLATE_KEYBOARDS = {
+    lang_code: _build_translate_keyboard(lang_code) for lang_code in TRANSLATION_LANGUAGES
+}
+TRANSLATE_KEYBOARD_ALL = _build_translate_keyboard(None)
+
+def article_actions_keyboard(available_languages):
+    """Get the action menu for an article with the given language links"""
+    if available_languages and len(available_languages) > 1:
+        return ARTICLE_ACTIONS_KEYBOARD
+    return ARTICLE_ACTIONS_KEYBOARD_NO_LANGUAGES
+
+def split_into_chunks(content, max_length=3000):
+    """
+    Split text into message-sized chunks, preferring paragraph, line and sentence breaks.
+    
+    Breaks are searched for in place with bounded rfind calls, so the text
+    is only copied once, into the chunks themselves.
+    """
+    chunks = []
+    start = 0
+    length = len(content)
+    
+    while start < length:
+        end = start + max_length
+        if end >= length:
+            chunks.append(content[start:])
+            break
+        
+        # Find a good breaking point
+        split_point = content.rfind('\n\n', start, end)
+        if split_point == -1:
+            split_point = content.rfind('\n', start, end)
+        if split_point == -1:
+            split_point = content.rfind('. ', start, end)
+        split_point = split_point + 1 if split_point != -1 else end
+        
+        chunks.append(content[start:split_point])
+        start = split_point
+    
+    return chunks
+
+# Wikipedia and translation calls block on HTTP, so they run in worker
+# threads; one slow lookup then can't stall every other chat
+WIKI_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="wiki")
+
+async def run_blocking(func, *args):
+    """Run a blocking call in the Wikipedia worker pool and wait for its result"""
+    return await asyncio.get_running_loop().run_in_executor(WIKI_EXECUTOR, func, *args)
+
+# Translations and documents being produced, joined by a repeat request
+# (e.g. a double tap) instead of starting the same work again
+_inflight_translations = {}  # (title, from, to) -> task translating it
+_inflight_documents = {}  # (url, title, lang) -> task building the document
+
+def run_shared(inflight, key, func, *args):
+    """
+    Run func(*args) as one task per key, joined by every concurrent caller
+    
+    Args:
+        inflight (dict): Running tasks by key, for this kind of work
+        key: Identifies the work, e.g. (title, lang)
+        func: Coroutine function doing the work
+        
+    Returns:
+        An awaitable for the task's result, shielded so one caller giving up
+        doesn't cancel the work for the others
+    """
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(func(*args))
+        inflight[key] = task
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    return asyncio.shield(task)
+
+async def translate_article_shared(article, from_lang, to_lang):
+    """Translate an article in a worker thread, sharing a translation already in progress"""
+    key = (article['title'], from_lang, to_lang)
+    return await run_shared(_inflight_translations, key, run_blocking, translate_article_content, article, from_lang, to_lang)
+
+async def create_document_shared(article, language):
+    """Build an article document, sharing a build of the same document already in progress"""
+    # A translation keeps its original's URL, so the title tells the two apart
+    key = (article['url'], article['title'], language)
+    return await run_shared(_inflight_documents, key, create_document_bytes_async, article, language)
+
+# Telegram allows about one message per second to the same chat
+CHAT_SEND_INTERVAL = 1.0  # Seconds
+_chat_next_send = {}  # chat_id -> loop time the next message may go out
+
+async def pace_chat(chat_id):
+    """Wait until another message may be sent to the chat"""
+    now = asyncio.get_running_loop().time()
+    next_send = _chat_next_send.get(chat_id, now)
+    if next_send <= now:
+        next_send = now
+        
+        # Drop chats whose slot has passed, so the table stays small
+        for stale in [c for c, t in _chat_next_send.items() if t <= now]:
+            del _chat_next_send[stale]
+    
+    _chat_next_send[chat_id] = next_send + CHAT_SEND_INTERVAL
+    if next_send > now:
+        await asyncio.sleep(next_send - now)
+
+# Messages sent without waiting for them, bounded so a burst can't pile up tasks
+MAX_BACKGROUND_SENDS = 100
+_background_sends = set()
+
+async def send_in_background(bot, *args, **kwargs):
+    """Send a message without waiting for Telegram's reply, unless too many are already in flight"""
+    if len(_background_sends) >= MAX_BACKGROUND_SENDS:
+        await _send_logged(bot, *args, **kwargs)
+        return
+    
+    task = asyncio.create_task(_send_logged(bot, *args, **kwargs))
+    _background_sends.add(task)
+    task.add_done_callback(_background_sends.discard)
+
+def answer_in_background(bot, query_id):
+    """Acknowledge a callback query without waiting for Telegram's reply"""
+    task = asyncio.create_task(_answer_logged(bot, query_id))
+    _background_sends.add(task)
+    task.add_done_callback(_background_sends.discard)
+
+async def _answer_logged(bot, query_id):
+    try:
+        await bot.answerCallbackQuery(query_id)
+    except Exception as e:
+        logger.error(f"Error answering callback query: {str(e)}")
+
+async def _send_logged(bot, *args, **kwargs):
+    try:
+        await bot.sendMessage(*args, **kwargs)
+    except Exception as e:
+        logger.error(f"Error sending message: {str(e)}")
+
+async def send_chunked(bot, chat_id, header, content, footer, reply_markup):
+    """
+    Send long text as a run of paced messages
+    
+    The header starts the first message. The footer and keyboard go on the
+    last chunk when they fit, instead of in a closing message of their own.
+    """
+    messages = split_into_chunks(content) or [""]
+    messages[0] = header + messages[0]
+    
+    last = f"{messages[-1]}\n\n{footer}"
+    if len(last) <= MESSAGE_LIMIT:
+        messages[-1] = last
+    else:
+        messages.append(footer)
+    
+    for i, text in enumerate(messages):
+        await pace_chat(chat_id)
+        await bot.sendMessage(
+            chat_id,
+            text,
+            parse_mode="Markdown",
+            reply_markup=reply_markup if i == len(messages) - 1 else None
+        )
+
+def get_chat_state(chat_id):
+    """Get a chat's conversation state, kept with its data in user_data_cache"""
+    return user_data_cache.get(chat_id, {}).get('state', SELECTING_LANGUAGE)
+
+def set_chat_state(chat_id, state):
+    """Set a chat's conversation state; callbacks and the chat handler share it"""
+    user_data_cache.setdefault(chat_id, {})['state'] = state
+
+# State a chat moves to on each callback that changes it, keyed like the
+# callback handlers (by prefix, or by the whole data if there's no payload)
+CALLBACK_STATES = {
+    CB_LANGUAGE: SEARCHING,
+    CB_ARTICLE: SELECTING_ACTION,
+    "new_search": SELECTING_LANGUAGE,
+    "try_again": SEARCHING,
+}
 
 class BotHandler(telepot.aio.helper.ChatHandler):
     """Handler for handling regular messages and commands"""
     
-    def __init__(self, *args, **kwargs):
-        super(BotHandler, self).__init__(*args, **kwargs)
-        self.state = SELECTING_LANGUAGE
-        self.language = DEFAULT_LANGUAGE
+    @property
+    def state(self):
+        """This chat's conversation state"""
+        return get_chat_state(self.chat_id)
+    
+    @state.setter
+    def state(self, value):
+        set_chat_state(self.chat_id, value)
     
     async def on_chat_message(self, msg):
         """Handle incoming chat messages and commands"""
@@ -65,7 +349,7 @@ class BotHandler(telepot.aio.helper.ChatHandler):
         
         # Handle commands
         if text.startswith('/'):
-            command = text.split('@')[0].lower()  # Remove bot username from command
+            command = text.partition('@')[0].lower()  # Remove bot username from command
             
             if command == '/start':
                 await self.handle_start()
@@ -94,30 +378,13 @@ class BotHandler(telepot.aio.helper.ChatHandler):
         """Start the conversation and show language selection"""
         chat_id = self.chat_id
         
-        # Clear any existing user data
-        if chat_id in user_data_cache:
-            del user_data_cache[chat_id]
-        
-        # Initialize new user data
+        # Replace any existing user data with a fresh session in one step
         user_data_cache[chat_id] = {
             "language": DEFAULT_LANGUAGE
         }
         
-        # Create keyboard with language options
-        keyboard = []
-        row = []
-        
-        for i, (lang_code, lang_name) in enumerate(POPULAR_LANGUAGES.items()):
-            button = InlineKeyboardButton(
-                text=f"{lang_name} ({lang_code})", 
-                callback_data=f"{CB_LANGUAGE}:{lang_code}"
-            )
-            row.append(button)
-            
-            # Create rows with 2 buttons each
-            if len(row) == 2 or i == len(POPULAR_LANGUAGES) - 1:
-                keyboard.append(row)
-                row = []
+        # Keyboard with language options
+        keyboard = LANGUAGE_KEYBOARD
         
         # Send welcome message with language selection
         await self.bot.sendMessage(
@@ -125,7 +392,7 @@ class BotHandler(telepot.aio.helper.ChatHandler):
             "🌍 Welcome to WikiSearch Bot!\n\n"
             "I can help you search, read, and translate Wikipedia articles in multiple languages.\n\n"
             "Please select a language for your search:",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+            reply_markup=keyboard
         )
         
         self.state = SELECTING_LANGUAGE
@@ -164,6 +431,9 @@ class BotHandler(telepot.aio.helper.ChatHandler):
             "Operation cancelled. Type /start to begin a new search."
         )
         
+        # Free the chat's article data now instead of when it expires
+        user_data_cache.pop(chat_id, None)
+        
         self.state = SELECTING_LANGUAGE
     
     async def handle_search(self, query):
@@ -171,11 +441,9 @@ class BotHandler(telepot.aio.helper.ChatHandler):
         chat_id = self.chat_id
         
         # Get current language for the user
-        if chat_id not in user_data_cache:
-            user_data_cache[chat_id] = {}
-        
-        user_data = user_data_cache[chat_id]
+        user_data = user_data_cache.setdefault(chat_id, {})
         language = user_data.get('language', DEFAULT_LANGUAGE)
+        language_name = get_language_name(language)
         
         # Save the query
         user_data['search_query'] = query
@@ -183,11 +451,11 @@ class BotHandler(telepot.aio.helper.ChatHandler):
         # Show searching message
         wait_msg = await self.bot.sendMessage(
             chat_id,
-            f"Searching for '{query}' in {get_language_name(language)}..."
+            f"Searching for '{query}' in {language_name}..."
         )
         
         # Search Wikipedia
-        search_results = search_wikipedia(query, language)
+        search_results = await run_blocking(search_wikipedia, query, language)
         
         # Process search results
         if search_results:
@@ -212,30 +480,17 @@ class BotHandler(telepot.aio.helper.ChatHandler):
             # Show results
             await self.bot.editMessageText(
                 (chat_id, wait_msg['message_id']),
-                f"Search results for '{query}' in {get_language_name(language)}:\n"
+                f"Search results for '{query}' in {language_name}:\n"
                 f"Please select an article to view:",
                 reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
             )
         else:
             # No results found
-            keyboard = [
-                [
-                    InlineKeyboardButton(
-                        text="Try Different Search", 
-                        callback_data="try_again"
-                    ), 
-                    InlineKeyboardButton(
-                        text="Change Language", 
-                        callback_data="new_search"
-                    )
-                ]
-            ]
-            
             await self.bot.editMessageText(
                 (chat_id, wait_msg['message_id']),
-                f"No results found for '{query}' in {get_language_name(language)}.\n\n"
+                f"No results found for '{query}' in {language_name}.\n\n"
                 f"Would you like to try a different search or change the language?",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+                reply_markup=NO_RESULTS_KEYBOARD
             )
         
         self.state = VIEWING_ARTICLE
@@ -245,54 +500,68 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
     """Handler for handling callback queries from inline buttons"""
     
     def __init__(self, *args, **kwargs):
-        super(CallbackQueryHandler, self).__init__(*args, **kwargs)
-        self.language = DEFAULT_LANGUAGE
+        super().__init__(*args, **kwargs)
+        
+        # Callback handlers, keyed by callback data prefix (called with the whole data)
+        self.callback_handlers = {
+            CB_LANGUAGE: self.handle_language_selection,
+            CB_ARTICLE: self.handle_article_selection,
+            CB_ACTION: self.handle_action_selection,
+            CB_VIEW_LANG: self.handle_view_language_selection,
+            CB_TRANSLATE: self.handle_translate_selection,
+        }
+        
+        # Callback handlers for data without a payload, keyed by the whole data
+        self.action_callback_handlers = {
+            "new_search": self.handle_new_search,
+            "try_again": self.handle_try_again,
+            "back_to_article": self.handle_back_to_article,
+            "read_translation": self.handle_read_translation,
+            "download_translation": self.handle_download_translation,
+            "back_to_translation": self.handle_back_to_translation,
+        }
+        
+        # Article actions, keyed by the CB_ACTION payload
+        self.article_actions = {
+            "read": self.handle_read_action,
+            "languages": self.handle_languages_action,
+            "translate": self.handle_translate_action,
+            "download": self.handle_download_action,
+            "link": self.handle_link_action,
+        }
+    
+    async def edit_or_send(self, msg_identifier, *args, **kwargs):
+        """Edit a message, or send a new one if it can't be edited (e.g. too old)"""
+        try:
+            return await self.bot.editMessageText(msg_identifier, *args, **kwargs)
+        except telepot.exception.TelegramError:
+            return await self.bot.sendMessage(msg_identifier[0], *args, **kwargs)
     
     async def on_callback_query(self, msg):
         """Handle callback queries from inline keyboards"""
         query_id, from_id, query_data = telepot.glance(msg, flavor='callback_query')
         
-        # Always acknowledge the callback query to stop the loading indicator
-        await self.bot.answerCallbackQuery(query_id)
-        
-        # Handle language selection
-        if query_data.startswith(f"{CB_LANGUAGE}:"):
-            await self.handle_language_selection(msg, query_data)
-        
-        # Handle article selection
-        elif query_data.startswith(f"{CB_ARTICLE}:"):
-            await self.handle_article_selection(msg, query_data)
+        # Always acknowledge the callback query to stop the loading indicator,
+        # alongside the handler rather than before it
+        answer_in_background(self.bot, query_id)
         
-        # Handle action selection
-        elif query_data.startswith(f"{CB_ACTION}:"):
-            await self.handle_action_selection(msg, query_data)
+        # Prefix of "prefix:payload" callback data, or the whole data if there's no payload
+        prefix, sep, _ = query_data.partition(':')
         
-        # Handle language view selection
-        elif query_data.startswith(f"{CB_VIEW_LANG}:"):
-            await self.handle_view_language_selection(msg, query_data)
+        # Update the state for the chat handler before the handler shows its prompt
+        next_state = CALLBACK_STATES.get(prefix)
+        if next_state is not None:
+            set_chat_state(msg['message']['chat']['id'], next_state)
         
-        # Handle translation language selection
-        elif query_data.startswith(f"{CB_TRANSLATE}:"):
-            await self.handle_translate_selection(msg, query_data)
-        
-        # Handle navigation actions
-        elif query_data == "new_search":
-            await self.handle_new_search(msg)
-        
-        elif query_data == "try_again":
-            await self.handle_try_again(msg)
-        
-        elif query_data == "back_to_article":
-            await self.handle_back_to_article(msg)
-        
-        elif query_data == "read_translation":
-            await self.handle_read_translation(msg)
-        
-        elif query_data == "download_translation":
-            await self.handle_download_translation(msg)
+        # Dispatch on the prefix, or on the whole data if there's no payload
+        handler = self.callback_handlers.get(prefix) if sep else None
+        if handler is not None:
+            await handler(msg, query_data)
+            return
         
-        elif query_data == "back_to_translation":
-            await self.handle_back_to_translation(msg)
+        handler = self.action_callback_handlers.get(query_data)
+        if handler is not None:
+            await handler(msg)
     
     async def handle_language_selection(self, msg, query_data):
         """Handle language selection callback"""
@@ -300,16 +569,10 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
         message_id = msg['message']['message_id']
         
         # Extract language code from callback data
-        lang_code = query_data.split(':', 1)[1]
+        lang_code = query_data.partition(':')[2]
         
         # Save the selected language
-        self.language = lang_code
-        
-        # Update user data cache
-        if chat_id not in user_data_cache:
-            user_data_cache[chat_id] = {}
-        user_data_cache[chat_id]['language'] = lang_code
-        user_data_cache[chat_id]['state'] = SEARCHING  # Store state in cache
+        user_data_cache.setdefault(chat_id, {})['language'] = lang_code
         
         # Prompt for search term
         await self.bot.editMessageText(
@@ -324,12 +587,10 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
         message_id = msg['message']['message_id']
         
         # Extract article title from callback data
-        title = query_data.split(':', 1)[1]
+        title = query_data.partition(':')[2]
         
         # Get user data
-        if chat_id not in user_data_cache:
-            user_data_cache[chat_id] = {}
-        user_data = user_data_cache[chat_id]
+        user_data = user_data_cache.setdefault(chat_id, {})
         
         language = user_data.get('language', DEFAULT_LANGUAGE)
         
@@ -339,19 +600,14 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
             f"Loading article '{title}'..."
         )
         
-        article = get_wikipedia_article(title, language)
+        article = await run_blocking(get_wikipedia_article, title, language)
         
         if not article:
             # Article not found
-            keyboard = [[
-                InlineKeyboardButton(text="Try again", callback_data="try_again"),
-                InlineKeyboardButton(text="New search", callback_data="new_search")
-            ]]
-            
             await self.bot.editMessageText(
                 (chat_id, message_id),
                 f"Sorry, could not retrieve the article '{title}'.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+                reply_markup=ARTICLE_NOT_FOUND_KEYBOARD
             )
             return
         
@@ -361,62 +617,11 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
         # Get available languages for the article
         available_languages = article.get('available_languages', {})
         
-        # Create keyboard for article actions
-        keyboard = []
-        
-        # Read full article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Read Full Article", 
-                callback_data=f"{CB_ACTION}:read"
-            )
-        ])
-        
-        # Other language versions button (if available)
-        if available_languages and len(available_languages) > 1:
-            keyboard.append([
-                InlineKeyboardButton(
-                    text="View in Another Language", 
-                    callback_data=f"{CB_ACTION}:languages"
-                )
-            ])
-        
-        # Translate article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Translate Article", 
-                callback_data=f"{CB_ACTION}:translate"
-            )
-        ])
-        
-        # Download article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Download as Document", 
-                callback_data=f"{CB_ACTION}:download"
-            )
-        ])
-        
-        # Copy article link button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Copy Wikipedia Link", 
-                callback_data=f"{CB_ACTION}:link"
-            )
-        ])
-        
-        # New search button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="New Search", 
-                callback_data="new_search"
-            )
-        ])
+        # Keyboard for article actions
+        keyboard = article_actions_keyboard(available_languages)
         
         # Format message with article summary (limit to ~1000 chars)
-        summary = article['summary']
-        if len(summary) > 1000:
-            summary = summary[:997] + "..."
+        summary = truncate_text(article['summary'], SUMMARY_LIMIT)
         
         message = (
             f"📚 *{article['title']}*\n\n"
@@ -428,14 +633,8 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
             (chat_id, message_id),
             message,
             parse_mode="Markdown",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+            reply_markup=keyboard
         )
-        
-        # Update the state for the chat handler
-        for handler in self.bot._router._handlers:
-            if isinstance(handler, BotHandler) and handler.chat_id == chat_id:
-                handler.state = SELECTING_ACTION
-                break
     
     async def handle_action_selection(self, msg, query_data):
         """Handle action selection for an article"""
@@ -443,17 +642,17 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
         message_id = msg['message']['message_id']
         
         # Extract action from callback data
-        action = query_data.split(':', 1)[1]
+        action = query_data.partition(':')[2]
         
         # Get user data
-        if chat_id not in user_data_cache:
+        user_data = user_data_cache.get(chat_id)
+        if user_data is None:
             await self.bot.sendMessage(
                 chat_id,
                 "Session expired. Please start a new search with /start."
             )
             return
         
-        user_data = user_data_cache[chat_id]
         article = user_data.get('current_article')
         
         if not article:
@@ -464,240 +663,145 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
             return
         
         # Process the selected action
-        if action == "read":
-            # Send the full article content
-            content = article['content']
-            
-            # Split into chunks if too long (Telegram has a 4096 char limit)
-            chunks = []
-            max_length = 3000  # Leave room for formatting
-            
-            while content:
-                if len(content) <= max_length:
-                    chunks.append(content)
-                    break
-                
-                # Find a good breaking point
-                split_point = content[:max_length].rfind('\n\n')
-                if split_point == -1:
-                    split_point = content[:max_length].rfind('\n')
-                if split_point == -1:
-                    split_point = content[:max_length].rfind('. ')
-                if split_point == -1:
-                    split_point = max_length
-                
-                chunks.append(content[:split_point+1])
-                content = content[split_point+1:]
-            
-            # Send each chunk
-            for i, chunk in enumerate(chunks):
-                if i == 0:
-                    await self.bot.sendMessage(
-                        chat_id,
-                        f"*{article['title']}*\n\n{chunk}",
-                        parse_mode="Markdown"
-                    )
-                else:
-                    await self.bot.sendMessage(
-                        chat_id,
-                        chunk,
-                        parse_mode="Markdown"
+        handler = self.article_actions.get(action)
+        if handler is not None:
+            await handler(chat_id, message_id, user_data, article)
+    
+    async def handle_read_action(self, chat_id, message_id, user_data, article):
+        """Send the full article text"""
+        content = article['content']
+        
+        # Send it in chunks, ending with a back to article button
+        await send_chunked(
+            self.bot,
+            chat_id,
+            f"*{article['title']}*\n\n",
+            content,
+            "End of article.",
+            BACK_TO_ARTICLE_KEYBOARD
+        )
+    
+    async def handle_languages_action(self, chat_id, message_id, user_data, article):
+        """Show the languages the article is available in"""
+        available_languages = article.get('available_languages', {})
+        
+        if not available_languages:
+            await self.bot.editMessageText(
+                (chat_id, message_id),
+                f"This article is only available in {get_language_name(user_data.get('language', DEFAULT_LANGUAGE))}.",
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
+            )
+            return
+        
+        # Create keyboard with available languages
+        keyboard = []
+        for lang_code, lang_title in available_languages.items():
+            if lang_code != user_data.get('language', DEFAULT_LANGUAGE):  # Skip current language
+                keyboard.append([
+                    InlineKeyboardButton(
+                        text=f"{get_language_name(lang_code)} - {lang_title}", 
+                        callback_data=f"{CB_VIEW_LANG}:{lang_code}"
                     )
-            
-            # Add back to article button
-            keyboard = [[
-                InlineKeyboardButton(
-                    text="Back to Article", 
-                    callback_data="back_to_article"
-                )
-            ]]
-            
-            await self.bot.sendMessage(
-                chat_id,
-                "End of article.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+                ])
+        
+        # Add back button
+        keyboard.append([
+            InlineKeyboardButton(
+                text="Back to Article", 
+                callback_data="back_to_article"
             )
+        ])
         
-        elif action == "languages":
-            # Show available languages
-            available_languages = article.get('available_languages', {})
+        await self.bot.editMessageText(
+            (chat_id, message_id),
+            f"'{article['title']}' is available in these languages:",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+        )
+    
+    async def handle_translate_action(self, chat_id, message_id, user_data, article):
+        """Show translation target languages"""
+        language = user_data.get('language', DEFAULT_LANGUAGE)
+        
+        # Translation options, leaving out the current language
+        keyboard = TRANSLATE_KEYBOARDS.get(language, TRANSLATE_KEYBOARD_ALL)
+        
+        await self.bot.editMessageText(
+            (chat_id, message_id),
+            f"Translate '{article['title']}' to:",
+            reply_markup=keyboard
+        )
+    
+    async def handle_download_action(self, chat_id, message_id, user_data, article):
+        """Generate and send the article as a document"""
+        language = user_data.get('language', DEFAULT_LANGUAGE)
+        
+        await self.bot.editMessageText(
+            (chat_id, message_id),
+            f"Generating document for '{article['title']}'..."
+        )
+        
+        try:
+            data = await create_document_shared(article, language)
             
-            if not available_languages:
+            if not data:
                 await self.bot.editMessageText(
                     (chat_id, message_id),
-                    f"This article is only available in {get_language_name(self.language)}.",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                        InlineKeyboardButton(
-                            text="Back to Article", 
-                            callback_data="back_to_article"
-                        )
-                    ]])
+                    "Sorry, there was an error generating the document.",
+                    reply_markup=BACK_TO_ARTICLE_KEYBOARD
                 )
                 return
             
-            # Create keyboard with available languages
-            keyboard = []
-            for lang_code, lang_title in available_languages.items():
-                if lang_code != self.language:  # Skip current language
-                    keyboard.append([
-                        InlineKeyboardButton(
-                            text=f"{get_language_name(lang_code)} - {lang_title}", 
-                            callback_data=f"{CB_VIEW_LANG}:{lang_code}"
-                        )
-                    ])
-            
-            # Add back button
-            keyboard.append([
-                InlineKeyboardButton(
-                    text="Back to Article", 
-                    callback_data="back_to_article"
-                )
-            ])
-            
-            await self.bot.editMessageText(
-                (chat_id, message_id),
-                f"'{article['title']}' is available in these languages:",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
-        
-        elif action == "translate":
-            # Show translation options
-            language = user_data.get('language', DEFAULT_LANGUAGE)
-            
-            # Translation languages to show
-            translation_languages = [
-                "en", "es", "fr", "de", "it", "pt", "ru", "ja", "zh", "ko", "ar"
-            ]
-            
-            # Remove current language from options
-            if language in translation_languages:
-                translation_languages.remove(language)
-            
-            # Create keyboard with translation options
-            keyboard = []
-            row = []
-            
-            for i, lang_code in enumerate(translation_languages):
-                button = InlineKeyboardButton(
-                    text=get_language_name(lang_code), 
-                    callback_data=f"{CB_TRANSLATE}:{lang_code}"
-                )
-                row.append(button)
-                
-                # 2 buttons per row
-                if len(row) == 2 or i == len(translation_languages) - 1:
-                    keyboard.append(row)
-                    row = []
-            
-            # Add back button
-            keyboard.append([
-                InlineKeyboardButton(
-                    text="Back to Article", 
-                    callback_data="back_to_article"
-                )
-            ])
-            
-            await self.bot.editMessageText(
-                (chat_id, message_id),
-                f"Translate '{article['title']}' to:",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+            # Send the document straight from memory
+            await self.bot.sendDocument(
+                chat_id,
+                document=(f"{safe_filename(article['title'])}.docx", io.BytesIO(data))
             )
-        
-        elif action == "download":
-            # Generate and send document
-            language = user_data.get('language', DEFAULT_LANGUAGE)
             
-            await self.bot.editMessageText(
-                (chat_id, message_id),
-                f"Generating document for '{article['title']}'..."
+            # Show success message
+            await send_in_background(
+                self.bot,
+                chat_id,
+                "Document generated successfully.",
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
             
-            try:
-                doc_path = create_document_from_article(article, language)
-                
-                if not doc_path or not os.path.exists(doc_path):
-                    await self.bot.editMessageText(
-                        (chat_id, message_id),
-                        "Sorry, there was an error generating the document.",
-                        reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                            InlineKeyboardButton(
-                                text="Back to Article", 
-                                callback_data="back_to_article"
-                            )
-                        ]])
-                    )
-                    return
-                
-                # Send the document
-                with open(doc_path, 'rb') as doc_file:
-                    await self.bot.sendDocument(
-                        chat_id,
-                        document=doc_file,
-                        filename=f"{article['title']}.docx"
-                    )
-                
-                # Clean up
-                os.remove(doc_path)
-                
-                # Show success message
-                await self.bot.sendMessage(
-                    chat_id,
-                    "Document generated successfully.",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                        InlineKeyboardButton(
-                            text="Back to Article", 
-                            callback_data="back_to_article"
-                        )
-                    ]])
-                )
-                
-            except Exception as e:
-                logger.error(f"Error generating document: {str(e)}")
-                
-                await self.bot.editMessageText(
-                    (chat_id, message_id),
-                    f"Error generating document: {str(e)}",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                        InlineKeyboardButton(
-                            text="Back to Article", 
-                            callback_data="back_to_article"
-                        )
-                    ]])
-                )
-        
-        elif action == "link":
-            # Get Wikipedia link
-            language = user_data.get('language', DEFAULT_LANGUAGE)
-            article_url = get_article_sharing_link(article['title'], language)
+        except Exception as e:
+            logger.error(f"Error generating document: {str(e)}")
             
             await self.bot.editMessageText(
                 (chat_id, message_id),
-                f"Wikipedia link for '{article['title']}':\n{article_url}",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Article", 
-                        callback_data="back_to_article"
-                    )
-                ]])
+                f"Error generating document: {str(e)}",
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
     
+    async def handle_link_action(self, chat_id, message_id, user_data, article):
+        """Show the Wikipedia link to the article"""
+        language = user_data.get('language', DEFAULT_LANGUAGE)
+        article_url = get_article_sharing_link(article['title'], language)
+        
+        await self.bot.editMessageText(
+            (chat_id, message_id),
+            f"Wikipedia link for '{article['title']}':\n{article_url}",
+            reply_markup=BACK_TO_ARTICLE_KEYBOARD
+        )
+    
     async def handle_view_language_selection(self, msg, query_data):
         """Handle viewing article in another language"""
         chat_id = msg['message']['chat']['id']
         message_id = msg['message']['message_id']
         
         # Extract target language from callback data
-        target_lang = query_data.split(':', 1)[1]
+        target_lang = query_data.partition(':')[2]
         
         # Get user data
-        if chat_id not in user_data_cache:
+        user_data = user_data_cache.get(chat_id)
+        if user_data is None:
             await self.bot.sendMessage(
                 chat_id,
                 "Session expired. Please start a new search with /start."
             )
             return
         
-        user_data = user_data_cache[chat_id]
         article = user_data.get('current_article')
         
         if not article:
@@ -710,6 +814,11 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
         # Get source language
         source_lang = user_data.get('language', DEFAULT_LANGUAGE)
         
+        # Already showing this language: just show the article again
+        if target_lang == source_lang:
+            await self.handle_back_to_article(msg)
+            return
+        
         # Show loading message
         await self.bot.editMessageText(
             (chat_id, message_id),
@@ -723,93 +832,30 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
             await self.bot.editMessageText(
                 (chat_id, message_id),
                 f"This article is not available in {get_language_name(target_lang)}.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Article", 
-                        callback_data="back_to_article"
-                    )
-                ]])
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
             return
         
         # Get article in target language
         target_title = available_languages[target_lang]
-        target_article = get_article_in_other_language(target_title, target_lang)
+        target_article = await run_blocking(get_article_in_other_language, target_title, target_lang)
         
         if not target_article:
             await self.bot.editMessageText(
                 (chat_id, message_id),
                 f"Failed to retrieve article in {get_language_name(target_lang)}.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Article", 
-                        callback_data="back_to_article"
-                    )
-                ]])
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
             return
         
         # Update user data
-        user_data['current_article'] = target_article
-        user_data['language'] = target_lang
-        self.language = target_lang
-        
-        # Create keyboard for article actions
-        keyboard = []
-        
-        # Read full article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Read Full Article", 
-                callback_data=f"{CB_ACTION}:read"
-            )
-        ])
-        
-        # Other language versions button
-        if available_languages and len(available_languages) > 1:
-            keyboard.append([
-                InlineKeyboardButton(
-                    text="View in Another Language", 
-                    callback_data=f"{CB_ACTION}:languages"
-                )
-            ])
+        user_data.update(current_article=target_article, language=target_lang)
         
-        # Translate article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Translate Article", 
-                callback_data=f"{CB_ACTION}:translate"
-            )
-        ])
-        
-        # Download article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Download as Document", 
-                callback_data=f"{CB_ACTION}:download"
-            )
-        ])
-        
-        # Copy article link button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Copy Wikipedia Link", 
-                callback_data=f"{CB_ACTION}:link"
-            )
-        ])
-        
-        # New search button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="New Search", 
-                callback_data="new_search"
-            )
-        ])
+        # Keyboard for article actions
+        keyboard = article_actions_keyboard(available_languages)
         
         # Format message with article summary
-        summary = target_article['summary']
-        if len(summary) > 1000:
-            summary = summary[:997] + "..."
+        summary = truncate_text(target_article['summary'], SUMMARY_LIMIT)
             
         message = (
             f"📚 *{target_article['title']}*\n\n"
@@ -821,7 +867,7 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
             (chat_id, message_id),
             message,
             parse_mode="Markdown",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+            reply_markup=keyboard
         )
     
     async def handle_translate_selection(self, msg, query_data):
@@ -830,17 +876,17 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
         message_id = msg['message']['message_id']
         
         # Extract target language from callback data
-        target_lang = query_data.split(':', 1)[1]
+        target_lang = query_data.partition(':')[2]
         
         # Get user data
-        if chat_id not in user_data_cache:
+        user_data = user_data_cache.get(chat_id)
+        if user_data is None:
             await self.bot.sendMessage(
                 chat_id,
                 "Session expired. Please start a new search with /start."
             )
             return
         
-        user_data = user_data_cache[chat_id]
         article = user_data.get('current_article')
         
         if not article:
@@ -862,49 +908,24 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
         
         # Translate the article
         try:
-            translated_article = translate_article_content(article, source_lang, target_lang)
+            translated_article = await translate_article_shared(article, source_lang, target_lang)
             
             if not translated_article:
                 await self.bot.editMessageText(
                     (chat_id, message_id),
                     f"Failed to translate the article to {get_language_name(target_lang)}.",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                        InlineKeyboardButton(
-                            text="Back to Article", 
-                            callback_data="back_to_article"
-                        )
-                    ]])
+                    reply_markup=BACK_TO_ARTICLE_KEYBOARD
                 )
                 return
             
             # Store the translated article
-            user_data['translated_article'] = translated_article
-            user_data['translation_language'] = target_lang
+            user_data.update(translated_article=translated_article, translation_language=target_lang)
             
             # Format message with translated summary
-            summary = translated_article['summary']
-            if len(summary) > 1000:
-                summary = summary[:997] + "..."
+            summary = truncate_text(translated_article['summary'], SUMMARY_LIMIT)
                 
-            # Create keyboard for translation actions
-            keyboard = [
-                [InlineKeyboardButton(
-                    text="Read Full Translation", 
-                    callback_data="read_translation"
-                )],
-                [InlineKeyboardButton(
-                    text="Download Translation", 
-                    callback_data="download_translation"
-                )],
-                [InlineKeyboardButton(
-                    text="Back to Original Article", 
-                    callback_data="back_to_article"
-                )],
-                [InlineKeyboardButton(
-                    text="New Search", 
-                    callback_data="new_search"
-                )]
-            ]
+            # Keyboard for translation actions
+            keyboard = TRANSLATION_ACTIONS_KEYBOARD
             
             message = (
                 f"📚 *{translated_article['title']}*\n\n"
@@ -917,7 +938,7 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
                 (chat_id, message_id),
                 message,
                 parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
+                reply_markup=keyboard
             )
             
         except Exception as e:
@@ -926,106 +947,55 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
             await self.bot.editMessageText(
                 (chat_id, message_id),
                 f"Translation error: {str(e)}",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Article", 
-                        callback_data="back_to_article"
-                    )
-                ]])
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
     
     async def handle_new_search(self, msg):
         """Handle new search button click"""
         chat_id = msg['message']['chat']['id']
         
-        # Get current language
-        if chat_id in user_data_cache:
-            language = user_data_cache[chat_id].get('language', DEFAULT_LANGUAGE)
-        else:
-            language = DEFAULT_LANGUAGE
-            
-        # Create keyboard with language options
-        keyboard = []
-        row = []
-        
-        for i, (lang_code, lang_name) in enumerate(POPULAR_LANGUAGES.items()):
-            button = InlineKeyboardButton(
-                text=f"{lang_name} ({lang_code})", 
-                callback_data=f"{CB_LANGUAGE}:{lang_code}"
-            )
-            row.append(button)
+        # A new search starts from language selection, so the chat's article
+        # data can be freed now instead of when it expires
+        user_data_cache.pop(chat_id, None)
             
-            # Create rows with 2 buttons each
-            if len(row) == 2 or i == len(POPULAR_LANGUAGES) - 1:
-                keyboard.append(row)
-                row = []
+        # Keyboard with language options
+        keyboard = LANGUAGE_KEYBOARD
         
         # Update the message
-        try:
-            await self.bot.editMessageText(
-                (chat_id, msg['message']['message_id']),
-                "🌍 Start a new search!\n\n"
-                "Please select a language for your search:",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
-        except telepot.exception.TelegramError:
-            # If we can't edit the message (e.g., too old), send a new one
-            await self.bot.sendMessage(
-                chat_id,
-                "🌍 Start a new search!\n\n"
-                "Please select a language for your search:",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
-        
-        # Update the state for the chat handler
-        for handler in self.bot._router._handlers:
-            if isinstance(handler, BotHandler) and handler.chat_id == chat_id:
-                handler.state = SELECTING_LANGUAGE
-                break
+        await self.edit_or_send(
+            (chat_id, msg['message']['message_id']),
+            "🌍 Start a new search!\n\n"
+            "Please select a language for your search:",
+            reply_markup=keyboard
+        )
                 
     async def handle_try_again(self, msg):
         """Handle try again button click"""
         chat_id = msg['message']['chat']['id']
         
         # Get user data
-        if chat_id not in user_data_cache:
-            user_data_cache[chat_id] = {}
-            
-        user_data = user_data_cache[chat_id]
+        user_data = user_data_cache.setdefault(chat_id, {})
         language = user_data.get('language', DEFAULT_LANGUAGE)
         
         # Prompt for a new search
-        try:
-            await self.bot.editMessageText(
-                (chat_id, msg['message']['message_id']),
-                f"Please enter a new search query (language: {get_language_name(language)}):"
-            )
-        except telepot.exception.TelegramError:
-            # If we can't edit the message, send a new one
-            await self.bot.sendMessage(
-                chat_id,
-                f"Please enter a new search query (language: {get_language_name(language)}):"
-            )
-        
-        # Update the state for the chat handler
-        for handler in self.bot._router._handlers:
-            if isinstance(handler, BotHandler) and handler.chat_id == chat_id:
-                handler.state = SEARCHING
-                break
+        await self.edit_or_send(
+            (chat_id, msg['message']['message_id']),
+            f"Please enter a new search query (language: {get_language_name(language)}):"
+        )
                 
     async def handle_back_to_article(self, msg):
         """Navigate back to article summary view"""
         chat_id = msg['message']['chat']['id']
         
         # Get user data
-        if chat_id not in user_data_cache:
+        user_data = user_data_cache.get(chat_id)
+        if user_data is None:
             await self.bot.sendMessage(
                 chat_id,
                 "Session expired. Please start a new search with /start."
             )
             return
             
-        user_data = user_data_cache[chat_id]
         article = user_data.get('current_article')
         
         if not article:
@@ -1038,63 +1008,12 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
         # Get language
         language = user_data.get('language', DEFAULT_LANGUAGE)
         
-        # Create keyboard for article actions
-        keyboard = []
-        
-        # Read full article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Read Full Article", 
-                callback_data=f"{CB_ACTION}:read"
-            )
-        ])
-        
-        # Other language versions button
         available_languages = article.get('available_languages', {})
-        if available_languages and len(available_languages) > 1:
-            keyboard.append([
-                InlineKeyboardButton(
-                    text="View in Another Language", 
-                    callback_data=f"{CB_ACTION}:languages"
-                )
-            ])
-        
-        # Translate article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Translate Article", 
-                callback_data=f"{CB_ACTION}:translate"
-            )
-        ])
-        
-        # Download article button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Download as Document", 
-                callback_data=f"{CB_ACTION}:download"
-            )
-        ])
-        
-        # Copy article link button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="Copy Wikipedia Link", 
-                callback_data=f"{CB_ACTION}:link"
-            )
-        ])
-        
-        # New search button
-        keyboard.append([
-            InlineKeyboardButton(
-                text="New Search", 
-                callback_data="new_search"
-            )
-        ])
+        # Keyboard for article actions
+        keyboard = article_actions_keyboard(available_languages)
         
         # Format message with article summary
-        summary = article['summary']
-        if len(summary) > 1000:
-            summary = summary[:997] + "..."
+        summary = truncate_text(article['summary'], SUMMARY_LIMIT)
             
         message = (
             f"📚 *{article['title']}*\n\n"
@@ -1102,47 +1021,33 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
             f"_Language: {get_language_name(language)}_"
         )
         
-        try:
-            await self.bot.editMessageText(
-                (chat_id, msg['message']['message_id']),
-                message,
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
-        except telepot.exception.TelegramError:
-            # If we can't edit the message, send a new one
-            await self.bot.sendMessage(
-                chat_id,
-                message,
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
+        await self.edit_or_send(
+            (chat_id, msg['message']['message_id']),
+            message,
+            parse_mode="Markdown",
+            reply_markup=keyboard
+        )
     
     async def handle_read_translation(self, msg):
         """Display the full translated article content"""
         chat_id = msg['message']['chat']['id']
         
         # Get user data
-        if chat_id not in user_data_cache:
+        user_data = user_data_cache.get(chat_id)
+        if user_data is None:
             await self.bot.sendMessage(
                 chat_id,
                 "Session expired. Please start a new search with /start."
             )
             return
             
-        user_data = user_data_cache[chat_id]
         translated_article = user_data.get('translated_article')
         
         if not translated_article:
             await self.bot.sendMessage(
                 chat_id,
                 "Translation not found. Please translate the article again.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Article", 
-                        callback_data="back_to_article"
-                    )
-                ]])
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
             return
             
@@ -1153,56 +1058,16 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
         # Send the full translated content
         content = translated_article['content']
         
-        # Split into chunks if too long (Telegram has a 4096 char limit)
-        chunks = []
-        max_length = 3000  # Leave room for formatting
-        
-        while content:
-            if len(content) <= max_length:
-                chunks.append(content)
-                break
-            
-            # Find a good breaking point
-            split_point = content[:max_length].rfind('\n\n')
-            if split_point == -1:
-                split_point = content[:max_length].rfind('\n')
-            if split_point == -1:
-                split_point = content[:max_length].rfind('. ')
-            if split_point == -1:
-                split_point = max_length
-            
-            chunks.append(content[:split_point+1])
-            content = content[split_point+1:]
-        
-        # Send each chunk
-        for i, chunk in enumerate(chunks):
-            if i == 0:
-                await self.bot.sendMessage(
-                    chat_id,
-                    f"*{translated_article['title']}*\n\n"
-                    f"Translated from {get_language_name(source_lang)} to {get_language_name(target_lang)}\n\n"
-                    f"{chunk}",
-                    parse_mode="Markdown"
-                )
-            else:
-                await self.bot.sendMessage(
-                    chat_id,
-                    chunk,
-                    parse_mode="Markdown"
-                )
-        
-        # Add back button
-        await self.bot.sendMessage(
+        # Send it in chunks, ending with a back button
+        await send_chunked(
+            self.bot,
             chat_id,
+            f"*{translated_article['title']}*\n\n"
+            f"Translated from {get_language_name(source_lang)} to {get_language_name(target_lang)}\n\n",
+            content,
             "End of translated article.\n\n"
             "_Note: This is a machine translation and may not be perfect._",
-            parse_mode="Markdown",
-            reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                InlineKeyboardButton(
-                    text="Back to Translation", 
-                    callback_data="back_to_translation"
-                )
-            ]])
+            BACK_TO_TRANSLATION_KEYBOARD
         )
     
     async def handle_download_translation(self, msg):
@@ -1211,26 +1076,21 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
         message_id = msg['message']['message_id']
         
         # Get user data
-        if chat_id not in user_data_cache:
+        user_data = user_data_cache.get(chat_id)
+        if user_data is None:
             await self.bot.sendMessage(
                 chat_id,
                 "Session expired. Please start a new search with /start."
             )
             return
             
-        user_data = user_data_cache[chat_id]
         translated_article = user_data.get('translated_article')
         
         if not translated_article:
             await self.bot.editMessageText(
                 (chat_id, message_id),
                 "Translation not found. Please translate the article again.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Article", 
-                        callback_data="back_to_article"
-                    )
-                ]])
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
             return
             
@@ -1245,42 +1105,28 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
         
         try:
             # Create document
-            doc_path = create_document_from_article(translated_article, target_lang)
+            data = await create_document_shared(translated_article, target_lang)
             
-            if not doc_path or not os.path.exists(doc_path):
+            if not data:
                 await self.bot.editMessageText(
                     (chat_id, message_id),
                     "Sorry, there was an error generating the document.",
-                    reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                        InlineKeyboardButton(
-                            text="Back to Translation", 
-                            callback_data="back_to_translation"
-                        )
-                    ]])
+                    reply_markup=BACK_TO_TRANSLATION_KEYBOARD
                 )
                 return
             
-            # Send the document
-            with open(doc_path, 'rb') as doc_file:
-                await self.bot.sendDocument(
-                    chat_id,
-                    document=doc_file,
-                    filename=f"{translated_article['title']}_{target_lang}.docx"
-                )
-            
-            # Clean up
-            os.remove(doc_path)
+            # Send the document straight from memory
+            await self.bot.sendDocument(
+                chat_id,
+                document=(f"{safe_filename(translated_article['title'])}_{target_lang}.docx", io.BytesIO(data))
+            )
             
             # Show success message
-            await self.bot.sendMessage(
+            await send_in_background(
+                self.bot,
                 chat_id,
                 "Translation document generated successfully.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Translation", 
-                        callback_data="back_to_translation"
-                    )
-                ]])
+                reply_markup=BACK_TO_TRANSLATION_KEYBOARD
             )
             
         except Exception as e:
@@ -1289,12 +1135,7 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
             await self.bot.editMessageText(
                 (chat_id, message_id),
                 f"Error generating document: {str(e)}",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Translation", 
-                        callback_data="back_to_translation"
-                    )
-                ]])
+                reply_markup=BACK_TO_TRANSLATION_KEYBOARD
             )
     
     async def handle_back_to_translation(self, msg):
@@ -1302,26 +1143,21 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
         chat_id = msg['message']['chat']['id']
         
         # Get user data
-        if chat_id not in user_data_cache:
+        user_data = user_data_cache.get(chat_id)
+        if user_data is None:
             await self.bot.sendMessage(
                 chat_id,
                 "Session expired. Please start a new search with /start."
             )
             return
             
-        user_data = user_data_cache[chat_id]
         translated_article = user_data.get('translated_article')
         
         if not translated_article:
             await self.bot.sendMessage(
                 chat_id,
                 "Translation not found. Please translate the article again.",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
-                    InlineKeyboardButton(
-                        text="Back to Article", 
-                        callback_data="back_to_article"
-                    )
-                ]])
+                reply_markup=BACK_TO_ARTICLE_KEYBOARD
             )
             return
             
@@ -1330,29 +1166,10 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
         target_lang = user_data.get('translation_language', "en")
         
         # Format message with translated summary
-        summary = translated_article['summary']
-        if len(summary) > 1000:
-            summary = summary[:997] + "..."
+        summary = truncate_text(translated_article['summary'], SUMMARY_LIMIT)
             
-        # Create keyboard for translation actions
-        keyboard = [
-            [InlineKeyboardButton(
-                text="Read Full Translation", 
-                callback_data="read_translation"
-            )],
-            [InlineKeyboardButton(
-                text="Download Translation", 
-                callback_data="download_translation"
-            )],
-            [InlineKeyboardButton(
-                text="Back to Original Article", 
-                callback_data="back_to_article"
-            )],
-            [InlineKeyboardButton(
-                text="New Search", 
-                callback_data="new_search"
-            )]
-        ]
+        # Keyboard for translation actions
+        keyboard = TRANSLATION_ACTIONS_KEYBOARD
         
         message = (
             f"📚 *{translated_article['title']}*\n\n"
@@ -1361,18 +1178,9 @@ class CallbackQueryHandler(telepot.aio.helper.CallbackQueryOriginHandler):
             f"_Note: This is a machine translation and may not be perfect._"
         )
         
-        try:
-            await self.bot.editMessageText(
-                (chat_id, msg['message']['message_id']),
-                message,
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
-        except telepot.exception.TelegramError:
-            # If we can't edit the message, send a new one
-            await self.bot.sendMessage(
-                chat_id,
-                message,
-                parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(inline_keyboard=keyboard)
-            )
\ No newline at end of file
+        await self.edit_or_send(
+            (chat_id, msg['message']['message_id']),
+            message,
+            parse_mode="Markdown",
+            reply_markup=keyboard
+        )
\ No newline at end of file
@@ -4,7 +4,11 @@ Module for handling Wikipedia article data and operations
 
 import os
 import logging
+import threading
 import urllib.parse
+from functools import lru_cache
+
+from cachetools import TTLCache
 
 from config import LANGUAGE_NAMES
 from wiki_utils import (
@@ -15,9 +19,31 @@ from wiki_utils import (
     translate_text
 )
 
+# Wikipedia lookups shared by all chats, so a repeated search or a re-opened
+# article skips the network. Lookups run in worker threads, hence the lock.
+WIKI_CACHE_SIZE = 2048
+WIKI_CACHE_TTL = 600  # Seconds
+_wiki_cache = TTLCache(maxsize=WIKI_CACHE_SIZE, ttl=WIKI_CACHE_TTL)  # (function name, *args) -> result
+_wiki_cache_lock = threading.Lock()
+
+def _cached_lookup(func, *args):
+    """Return func(*args) from the Wikipedia cache, calling it on a miss; empty results aren't cached"""
+    key = (func.__name__,) + args
+    with _wiki_cache_lock:
+        result = _wiki_cache.get(key)
+    if result is not None:
+        return result
+    
+    result = func(*args)
+    if result:
+        with _wiki_cache_lock:
+            _wiki_cache[key] = result
+    return result
+
+@lru_cache(maxsize=512)
 def get_language_name(lang_code):
     """Get language name from language code"""
-    return LANGUAGE_NAMES.get(lang_code, lang_code.upper())
+    return LANGUAGE_NAMES.get(lang_code) or lang_code.upper()
 
 def search_wikipedia(query, language="en"):
     """
@@ -30,7 +56,7 @@ def search_wikipedia(query, language="en"):
     Returns:
         list: List of article titles
     """
-    return get_wikipedia_search_results(query, language)
+    return _cached_lookup(get_wikipedia_search_results, query, language)
 
 def get_wikipedia_article(title, language="en"):
     """
@@ -43,6 +69,10 @@ def get_wikipedia_article(title, language="en"):
     Returns:
         dict: Article content or None if not found
     """
+    return _cached_lookup(_fetch_wikipedia_article, title, language)
+
+def _fetch_wikipedia_article(title, language):
+    """Fetch an article and its language links (uncached, see get_wikipedia_article)"""
     # Get article content
     article = get_article_content(title, language)
     
@@ -68,6 +98,10 @@ def get_article_in_other_language(title, target_lang):
     Returns:
         dict: Article in target language or None if not available
     """
+    return _cached_lookup(_fetch_article_in_other_language, title, target_lang)
+
+def _fetch_article_in_other_language(title, target_lang):
+    """Fetch an article in another language (uncached, see get_article_in_other_language)"""
     # Get article in the target language (using title already in target language)
     article = get_article_in_language(title, target_lang)
     
@@ -97,6 +131,10 @@ def translate_article_content(article, from_lang, to_lang):
     if not article:
         return None
     
+    # Already in the target language
+    if from_lang == to_lang:
+        return article
+    
     try:
         # Translate title, summary, and content
         translated_title = translate_text(article['title'], to_lang, from_lang)
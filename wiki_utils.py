@@ -3,9 +3,22 @@ import threading
 import urllib.parse
 import requests
 import json
+import hashlib
 import logging
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+# Shared HTTP session so connections to Wikipedia and the translation API are
+# pooled across all chats instead of opening a new TCP/TLS connection per call
+HTTP_POOL_SIZE = 100
+http_session = requests.Session()
+_http_adapter = requests.adapters.HTTPAdapter(
+    pool_connections=HTTP_POOL_SIZE,
+    pool_maxsize=HTTP_POOL_SIZE
+)
+http_session.mount('https://', _http_adapter)
+http_session.mount('http://', _http_adapter)
+
 # Simple translation function without external dependencies
 def basic_translate(text, to_lang, from_lang='auto'):
     """Basic translation using free web API"""
@@ -15,7 +28,7 @@ def basic_translate(text, to_lang, from_lang='auto'):
     try:
         # Using Google Translate API for public use (free tier)
         fallback_url = f"https://translate.googleapis.com/translate_a/single?client=gtx&sl={from_lang}&tl={to_lang}&dt=t&q={urllib.parse.quote(text)}"
-        fallback_response = requests.get(fallback_url)
+        fallback_response = http_session.get(fallback_url)
         
         if fallback_response.status_code == 200:
             data = fallback_response.json()
@@ -58,7 +71,7 @@ def get_wikipedia_search_results(query, language="en"):
             "srlimit": 10
         }
         
-        response = requests.get(url, params=params)
+        response = http_session.get(url, params=params)
         data = response.json()
         
         # Extract titles from the search results
@@ -96,7 +109,7 @@ def get_article_content(title, language="en"):
             "explaintext": True
         }
         
-        summary_response = requests.get(url, params=summary_params)
+        summary_response = http_session.get(url, params=summary_params)
         summary_data = summary_response.json()
         
         # Extract page ID and summary
@@ -117,7 +130,7 @@ def get_article_content(title, language="en"):
             "explaintext": True
         }
         
-        content_response = requests.get(url, params=content_params)
+        content_response = http_session.get(url, params=content_params)
         content_data = content_response.json()
         
         # Extract full content
@@ -163,7 +176,7 @@ def get_available_languages(title, source_lang="en"):
             "lllimit": 500  # Get many language links
         }
         
-        response = requests.get(url, params=params)
+        response = http_session.get(url, params=params)
         data = response.json()
         
         # Extract language links
@@ -277,10 +290,18 @@ def translate_chunk(chunk, to_lang, from_lang):
 # Thread-safe lock for translation
 translate_lock = threading.Lock()
 
+# Translations keyed by a digest of the text and the language pair, so text
+# that was already translated (e.g. a revisited article) skips the network
+TRANSLATION_CACHE_SIZE = 512
+_translation_cache = OrderedDict()
+_translation_cache_lock = threading.Lock()
+
 def translate_text(text, to_lang, from_lang='auto'):
     """
     Translate text using multithreaded approach for efficiency
     
+    Results are cached by text digest and language pair.
+    
     Args:
         text (str): Text to translate
         to_lang (str): Target language code
@@ -292,6 +313,29 @@ def translate_text(text, to_lang, from_lang='auto'):
     if not text:
         return ""
     
+    # Nothing to do when translating into the same language
+    if from_lang == to_lang:
+        return text
+    
+    key = (hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest(), to_lang, from_lang)
+    with _translation_cache_lock:
+        translated = _translation_cache.get(key)
+        if translated is not None:
+            _translation_cache.move_to_end(key)
+            return translated
+    
+    translated = _translate_text(text, to_lang, from_lang)
+    
+    # The translator returns the input unchanged on failure; don't cache that
+    if translated != text:
+        with _translation_cache_lock:
+            _translation_cache[key] = translated
+            if len(_translation_cache) > TRANSLATION_CACHE_SIZE:
+                _translation_cache.popitem(last=False)
+    return translated
+
+def _translate_text(text, to_lang, from_lang):
+    """Translate text, splitting long texts into chunks translated concurrently"""
     try:
         # For very short texts, just translate directly without chunking
         if len(text) < 200:  # Reduced threshold to only skip chunking for very small texts
@@ -346,23 +390,73 @@ def translate_text(text, to_lang, from_lang='auto'):
         logging.error(f"Translation error: {str(e)}")
         return text  # Return original text if translation fails
 
+# Marker used to pack several texts into one translation request. Translation
+# may rewrite the surrounding whitespace, so it is matched loosely on the way back.
+BATCH_SEPARATOR = " §§§ "
+BATCH_SEPARATOR_RE = re.compile(r'\s*§\s*§\s*§\s*')
+
+def translate_texts(texts, to_lang, from_lang='auto'):
+    """
+    Translate several texts with one batched translation call
+    
+    The texts are joined with BATCH_SEPARATOR and translated together. If the
+    separators don't survive translation, the texts are translated one by one.
+    
+    Args:
+        texts (list): Texts to translate
+        to_lang (str): Target language code
+        from_lang (str): Source language code
+        
+    Returns:
+        list: Translated texts, in the same order as the input
+    """
+    if not texts:
+        return []
+    
+    translated = translate_text(BATCH_SEPARATOR.join(texts), to_lang, from_lang)
+    parts = BATCH_SEPARATOR_RE.split(translated.strip())
+    if len(parts) == len(texts):
+        return parts
+    
+    logging.warning("Batch separator lost in translation, translating texts individually")
+    return [translate_text(text, to_lang, from_lang) for text in texts]
+
+# Matches heading patterns like "== Title ==" or "=== Subsection ==="
+HEADING_PATTERN = re.compile(r'^(={2,6})\s*(.*?)\s*\1', re.MULTILINE)
+
+# Split results keyed by a digest of the content, so each article is parsed once
+SECTIONS_CACHE_SIZE = 256
+_sections_cache = OrderedDict()
+
 def split_content_into_sections(content):
     """
     Split Wikipedia content into sections based on headings for better document structuring
     
+    Results are cached by content digest; callers must not mutate the returned list.
+    
     Args:
         content (str): Wikipedia article content
         
     Returns:
         list: List of dictionaries with section titles and content
     """
-    # Find all section headings using regex
-    # This pattern matches heading patterns like "== Title ==" or "=== Subsection ==="
-    heading_pattern = re.compile(r'^(={2,6})\s*(.*?)\s*\1', re.MULTILINE)
+    key = hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+    sections = _sections_cache.get(key)
+    if sections is not None:
+        _sections_cache.move_to_end(key)
+        return sections
     
+    sections = _split_content_into_sections(content)
+    _sections_cache[key] = sections
+    if len(_sections_cache) > SECTIONS_CACHE_SIZE:
+        _sections_cache.popitem(last=False)
+    return sections
+
+def _split_content_into_sections(content):
+    """Parse content into sections (uncached, see split_content_into_sections)"""
     # Find all headings and their positions
     headings = []
-    for match in heading_pattern.finditer(content):
+    for match in HEADING_PATTERN.finditer(content):
         level = len(match.group(1))
         title = match.group(2)
         pos = match.start()